@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analysis Pipeline Benchmark
+Times every CryptoSignalBot analysis step and an end-to-end scan on
+synthetic OHLCV served by a fake exchange. No network access needed.
+
+    python benchmark.py --symbols 12 --history 100 --output bench.json
+    python benchmark.py --baseline bench_baseline.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from bot_loader import create_bot
+from derivatives_sentiment import DerivativesSentiment, StaticDerivativesSource
+
+TIMEFRAME_MS = {
+    '1m': 60_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '1h': 3_600_000,
+    '4h': 14_400_000,
+    '1d': 86_400_000,
+}
+
+METHODS = [
+    'calculate_technical_indicators',
+    'calculate_volume_indicators',
+    'detect_market_structure',
+    'find_order_blocks_enhanced',
+    'detect_divergences',
+    'enhanced_signal_scoring',
+    'calculate_entry_exit_points',
+]
+
+
+def generate_ohlcv(length: int, timeframe: str = '1h', seed: int = 0,
+                   start_price: float = 100.0, end_ms: int = None) -> List[List[float]]:
+    """
+    Random-walk candles with occasional volume spikes, in ccxt row format
+    [timestamp_ms, open, high, low, close, volume]
+    """
+    rng = np.random.default_rng(seed)
+    step = TIMEFRAME_MS[timeframe]
+    if end_ms is None:
+        end_ms = int(time.time() * 1000) // step * step
+    timestamps = end_ms - step * np.arange(length - 1, -1, -1, dtype=np.int64)
+
+    # Regime-switching drift so trends and reversals both show up
+    drift = np.repeat(rng.normal(0, 0.002, length // 25 + 1), 25)[:length]
+    returns = drift + rng.normal(0, 0.008, length)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.r_[start_price, close[:-1]]
+    wick = np.abs(rng.normal(0, 0.004, (2, length)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+
+    spikes = np.where(rng.random(length) < 0.08, rng.uniform(2.0, 5.0, length), 1.0)
+    volume = rng.lognormal(10, 0.4, length) * spikes * (1 + 20 * np.abs(returns))
+
+    return np.column_stack([timestamps, open_, high, low, close, volume]).tolist()
+
+
+def to_frame(rows: List[List[float]]) -> pd.DataFrame:
+    """
+    Same conversion as CryptoSignalBot.get_market_data
+    """
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+class FakeExchange:
+    """
+    Minimal ccxt stand-in serving pre-generated candles
+    """
+
+    def __init__(self, symbols: List[str], timeframes: List[str], history: int, seed: int = 0):
+        self.candles = {}
+        for i, symbol in enumerate(symbols):
+            for j, timeframe in enumerate(timeframes):
+                self.candles[(symbol, timeframe)] = generate_ohlcv(
+                    history, timeframe, seed=seed + i * 100 + j, start_price=10.0 * (i + 1))
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: int = None,
+                    limit: int = None, params: Dict = None) -> List[List[float]]:
+        self.calls += 1
+        rows = self.candles[(symbol, timeframe)]
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+        return rows[-limit:] if limit else rows
+
+
+def _stats(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        'runs': len(samples),
+        'mean': statistics.fmean(samples),
+        'median': statistics.median(samples),
+        'min': ordered[0],
+        'p95': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+    }
+
+
+def _time(call: Callable, prepare: Callable, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        args = prepare()
+        start = time.perf_counter()
+        call(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_bot(exchange: FakeExchange, symbols: List[str], backend: str = None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = create_bot(indicator_backend=backend)
+    bot.exchange = exchange
+    bot.trading_pairs = list(symbols)
+    bot.request_delay = 0
+    bot.get_fear_greed_index = lambda: 50  # keep sentiment offline
+    bot.sentiment = DerivativesSentiment(StaticDerivativesSource.synthetic(symbols),
+                                         market_index=bot.get_fear_greed_index)
+    bot.sentiment.refresh(list(symbols))  # scans then read a ready snapshot
+    return bot
+
+
+def run_benchmark(symbols: int = 12, history: int = 100, repeat: int = 5,
+                  scan_repeat: int = 3, backend: str = None, seed: int = 0) -> Dict:
+    """
+    Run all timings and return a JSON-serializable result dict
+    """
+    pairs = [f"SYM{i:03d}/USDT" for i in range(symbols)]
+    exchange = FakeExchange(pairs, ['15m', '1h', '4h'], history, seed=seed)
+    bot = make_bot(exchange, pairs, backend)
+
+    frames = {key: to_frame(rows) for key, rows in exchange.candles.items()}
+    calls = {
+        'calculate_technical_indicators': lambda s: (frames[(s, '1h')].copy(),),
+        'calculate_volume_indicators': lambda s: (frames[(s, '1h')].copy(),),
+        'detect_market_structure': lambda s: (frames[(s, '1h')].copy(),),
+        'find_order_blocks_enhanced': lambda s: (frames[(s, '1h')].copy(),),
+        'detect_divergences': lambda s: (frames[(s, '1h')].copy(),),
+        'enhanced_signal_scoring': lambda s: (s, frames[(s, '15m')].copy(),
+                                              frames[(s, '1h')].copy(), frames[(s, '4h')].copy()),
+        'calculate_entry_exit_points': lambda s: (frames[(s, '1h')].copy(), 'LONG'),
+    }
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in METHODS:
+            method = getattr(bot, name)
+            samples = []
+            for symbol in pairs:
+                samples.extend(_time(method, lambda: calls[name](symbol), repeat))
+            results[name] = _stats(samples)
+
+        def fresh_scan():
+            bot.active_signals.clear()
+            return ()
+        results['scan_all_pairs'] = _stats(_time(bot.scan_all_pairs, fresh_scan, scan_repeat))
+
+    results['scan_all_pairs']['per_symbol'] = results['scan_all_pairs']['median'] / symbols
+    return {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'symbols': symbols,
+            'history': history,
+            'repeat': repeat,
+            'backend': bot.indicators.name,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+
+
+# Runs that differ in these measure different work and cannot be compared
+INCOMPARABLE_META = ('history', 'backend')
+
+
+def check_meta(current: Dict, baseline: Dict) -> List[str]:
+    """
+    Raise ValueError if the runs are not comparable; returns warnings for
+    differences compare() can account for
+    """
+    ours, theirs = current.get('meta', {}), baseline.get('meta', {})
+
+    def differs(key):
+        return key in ours and key in theirs and ours[key] != theirs[key]
+
+    mismatched = [f"{key} {theirs[key]} -> {ours[key]}" for key in INCOMPARABLE_META if differs(key)]
+    if mismatched:
+        raise ValueError(f"baseline is not comparable: {', '.join(mismatched)}")
+
+    warnings = []
+    if differs('symbols'):
+        warnings.append(f"symbols {theirs['symbols']} -> {ours['symbols']}: "
+                        "scan_all_pairs compared per symbol")
+    if differs('repeat'):
+        warnings.append(f"repeat {theirs['repeat']} -> {ours['repeat']}: medians from different sample sizes")
+    return warnings
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Compare medians against a baseline; returns one row per benchmark.
+    Raises ValueError if history or backend differ. With a different symbol
+    count the end-to-end scan is compared per symbol.
+    """
+    check_meta(current, baseline)
+    symbols_differ = current['meta'].get('symbols') != baseline.get('meta', {}).get('symbols')
+    rows = []
+    for name, stats in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        key = 'per_symbol' if symbols_differ and 'per_symbol' in stats and 'per_symbol' in base else 'median'
+        ratio = stats[key] / base[key] if base[key] else float('inf')
+        rows.append({
+            'name': name if key == 'median' else f"{name} (per symbol)",
+            'baseline': base[key],
+            'current': stats[key],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_results(report: Dict, comparison: List[Dict] = None):
+    meta = report['meta']
+    print(f"⏱️ Benchmark: {meta['symbols']} symbols x {meta['history']} candles | backend={meta['backend']}")
+    print("━" * 72)
+    for name, stats in report['results'].items():
+        print(f"{name:<32} median {stats['median']*1e3:9.3f} ms | p95 {stats['p95']*1e3:9.3f} ms")
+
+    if comparison:
+        print("\n📊 Against baseline:")
+        for row in comparison:
+            flag = '🔴 REGRESSION' if row['regression'] else ('🟢' if row['ratio'] < 1 else '⚪')
+            print(f"{row['name']:<32} {row['baseline']*1e3:9.3f} -> {row['current']*1e3:9.3f} ms "
+                  f"(x{row['ratio']:.2f}) {flag}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the CryptoSignalBot analysis pipeline')
+    parser.add_argument('--symbols', type=int, default=12)
+    parser.add_argument('--history', type=int, default=100, help='candles per timeframe')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per method per symbol')
+    parser.add_argument('--scan-repeat', type=int, default=3, help='end-to-end scan runs')
+    parser.add_argument('--backend', default=None, help='indicator backend (ta | numpy)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=None, help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown of the median before flagging (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.symbols, args.history, args.repeat, args.scan_repeat,
+                           args.backend, args.seed)
+
+    comparison, mismatch = None, None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            for warning in check_meta(report, baseline):
+                print(f"⚠️ Baseline differs: {warning}")
+            comparison = compare(report, baseline, args.threshold)
+            report['comparison'] = comparison
+        except ValueError as e:
+            mismatch = str(e)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_results(report, comparison)
+    print(f"\n📁 Results written to {args.output}")
+
+    if mismatch:
+        print(f"❌ {mismatch}")
+        return 2
+
+    if comparison and any(row['regression'] for row in comparison):
+        print("❌ Performance regression detected!")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bot Loader
+Imports the bot module from its script file (the filename is not a valid module name)
+"""
+
+import importlib.util
+import os
+import sys
+
+BOT_MODULE_NAME = 'crypto_bot_enhanced'
+BOT_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crypto_bot_enhanced (1).py')
+
+
+def load_bot_module():
+    """
+    Load (once) and return the bot module
+    """
+    module = sys.modules.get(BOT_MODULE_NAME)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(BOT_MODULE_NAME, BOT_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[BOT_MODULE_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[BOT_MODULE_NAME]
+        raise
+    return module
+
+
+def create_bot(*args, **kwargs):
+    """
+    Shortcut for load_bot_module().CryptoSignalBot(...)
+    """
+    return load_bot_module().CryptoSignalBot(*args, **kwargs)
@@ -7,30 +7,50 @@ Smart Money Concepts + Fundamental Analysis
 Intraday Trading (Max 24 hours)
 """
 
-import ccxt
-import pandas as pd
-import numpy as np
-import requests
+from __future__ import annotations
+
 import json
+import threading
 import time
 from datetime import datetime, timedelta
-import ta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import warnings
+from signal_records import SignalRecord, SignalStatus, SignalType, StatusRecord, CLOSED_STATUSES
+from indicators import get_backend
+from lazy_imports import lazy_import, import_times
+from market_cache import MarketCache
+from notifier import AlertDispatcher
+from market_buffer import MarketDataStore
+from resilience import ResilientCaller
+from derivatives_sentiment import DerivativesSentiment
+
+# Heavy dependencies are imported on first use to keep cold starts fast
+ccxt = lazy_import('ccxt')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+requests = lazy_import('requests')
 warnings.filterwarnings('ignore')
 
 class CryptoSignalBot:
-    def __init__(self, api_key: str = None, api_secret: str = None):
+    def __init__(self, api_key: str = None, api_secret: str = None, indicator_backend: str = None):
         """
         Initialize Crypto Analysis Bot
+        indicator_backend: 'ta' or 'numpy' (default from INDICATOR_BACKEND)
         """
-        # Binance Setup
-        self.exchange = ccxt.binance({
+        init_start = time.perf_counter()
+        
+        # Binance Setup (client is built on first use, markets come from the local cache)
+        self._exchange = None
+        self._exchange_lock = threading.Lock()
+        self._exchange_config = {
             'apiKey': api_key,
             'secret': api_secret,
             'sandbox': False,  # True for testing
             'enableRateLimit': True,
-        })
+            'timeout': 10000,  # ms, matches fetch_caller's hard timeout
+        }
+        self.market_cache = MarketCache()
+        self.timings = {}
         
         # Trading pairs
         self.trading_pairs = [
@@ -46,38 +66,182 @@ class CryptoSignalBot:
         self.min_rr_ratio = 2.0  # Minimum Risk/Reward
         self.max_risk_percent = 2.0  # Max risk per trade
         self.min_volume_spike = 1.5  # Minimum volume spike multiplier
+        self.request_delay = 0.5  # Seconds between pairs (rate limiting)
+        
+        # Indicator backend
+        self.indicators = get_backend(indicator_backend)
         
         # Active signals tracking
         self.active_signals = {}
         
-        print("🤖 Enhanced Crypto Analysis Bot Initialized!")
+        # Exchange fetches: circuit breakers, timeouts and hedged retries,
+        # with the last good candles kept as a stale fallback
+        self.fetch_caller = ResilientCaller(timeout=10.0, hedge_after=2.0)
+        self._last_candles = {}
+        self._fetched_at = {}
+        self.max_stale_candles = 1.0  # Skip scoring on inputs older than this many candles
+        self.stale_penalty = 0.5  # Score multiplier drop at max staleness
+        
+        # Per-symbol derivatives sentiment (funding rates, open interest), refreshed
+        # on a background thread when due; scoring only reads the cache
+        self._fear_greed = (0.0, None)
+        self.fear_greed_ttl = 300  # seconds
+        self.sentiment = DerivativesSentiment.from_env(self.fetch_caller, self.get_fear_greed_index)
+        self.sentiment_universe = None  # symbols z-scored together; trading_pairs if None
+        
+        # Per (symbol, timeframe) OHLCV ring buffers, enabled by MARKET_BUFFER_CAPACITY
+        self.market_store = MarketDataStore.from_env()
+        
+        # Scan prioritization: per-pair activity stats and pairs left over by a deadline
+        self.symbol_stats = {}
+        self.carry_over = []
+        self.last_scan = {}
+        
+        # Alert delivery (Telegram/webhook), set up from env if configured
+        self.notifier = AlertDispatcher.from_env(self.format_signal_output)
+        
+        self.timings['init'] = time.perf_counter() - init_start
+        print(f"🤖 Enhanced Crypto Analysis Bot Initialized! ({self.timings['init']*1000:.0f} ms)")
+    
+    @property
+    def exchange(self):
+        """
+        ccxt Binance client, created on first access (once, even from several threads)
+        """
+        if self._exchange is None:
+            with self._exchange_lock:
+                if self._exchange is None:
+                    start = time.perf_counter()
+                    exchange = ccxt.binance(self._exchange_config)
+                    try:
+                        self.timings['markets_source'] = self.market_cache.apply(exchange)
+                    except Exception as e:
+                        print(f"⚠️ Could not preload markets: {e}")
+                    self._exchange = exchange
+                    self.timings['exchange'] = time.perf_counter() - start
+        return self._exchange
+    
+    @exchange.setter
+    def exchange(self, exchange):
+        self._exchange = exchange
+    
+    def startup_report(self) -> Dict:
+        """
+        Import and initialization timings (seconds)
+        """
+        return {
+            'imports': import_times(),
+            'init': round(self.timings.get('init', 0.0), 4),
+            'exchange': round(self.timings['exchange'], 4) if 'exchange' in self.timings else None,
+            'markets_source': self.timings.get('markets_source'),
+        }
+    
+    def set_indicator_backend(self, name: str):
+        """
+        Switch indicator backend at runtime
+        """
+        self.indicators = get_backend(name)
     
     def get_fear_greed_index(self) -> Optional[int]:
         """
-        Get Fear & Greed Index
+        Get Fear & Greed Index (market-wide, cached for fear_greed_ttl)
         """
+        fetched_at, value = self._fear_greed
+        if value is not None and time.time() - fetched_at < self.fear_greed_ttl:
+            return value
         try:
             url = "https://api.alternative.me/fng/"
-            response = requests.get(url, timeout=10)
+            response = self.fetch_caller.call('fear_greed', requests.get, url, timeout=10)
             data = response.json()
-            return int(data['data'][0]['value'])
+            value = int(data['data'][0]['value'])
+            self._fear_greed = (time.time(), value)
+            return value
         except:
             return None
     
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, **kwargs) -> List:
+        """
+        fetch_ohlcv behind the circuit breaker, timeout and hedge.
+        The client (and a cold-cache market load) is resolved first, outside the timed call.
+        """
+        exchange = self.exchange
+        return self.fetch_caller.call('fetch_ohlcv',
+                                      lambda: exchange.fetch_ohlcv(symbol, timeframe, **kwargs))
+    
     def get_market_data(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
         """
-        Fetch price data from Binance
+        Fetch price data from Binance.
+        On failure, falls back to the last good candles with df.attrs['data_age'] set.
         """
+        key = (symbol, timeframe)
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            if self.market_store is not None:
+                df = self._get_buffered_market_data(symbol, timeframe, limit)
+            else:
+                ohlcv = self._fetch_ohlcv(symbol, timeframe, limit=limit)
+                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                df.set_index('timestamp', inplace=True)
+                cached = self._last_candles.get(key)
+                if cached is None or len(df) >= len(cached[1]):
+                    self._last_candles[key] = (time.time(), df.copy())
+            self._fetched_at[key] = time.time()
+            df.attrs['data_age'] = 0.0
             return df
         except Exception as e:
+            stale = self._stale_market_data(symbol, timeframe, limit)
+            if stale is not None:
+                print(f"⚠️ {symbol} {timeframe}: using cached candles ({stale.attrs['data_age']:.0f}s old) - {e}")
+                return stale
             print(f"❌ Error fetching data for {symbol}: {e}")
             return pd.DataFrame()
     
+    def _stale_market_data(self, symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+        """
+        Last good candles for a pair, marked with their age in seconds
+        """
+        key = (symbol, timeframe)
+        if self.market_store is not None:
+            if not self.market_store.size(symbol, timeframe) or key not in self._fetched_at:
+                return None
+            fetched_at = self._fetched_at[key]
+            df = self.market_store.frame(symbol, timeframe, limit)
+        else:
+            if key not in self._last_candles:
+                return None
+            fetched_at, cached = self._last_candles[key]
+            df = cached.tail(limit).copy()
+        df.attrs['data_age'] = time.time() - fetched_at
+        return df
+    
+    def _get_buffered_market_data(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """
+        Incremental fetch into the ring buffer; returns a zero-copy frame
+        (valid until the next fetch of the same symbol/timeframe)
+        """
+        store = self.market_store
+        last = store.last_timestamp(symbol, timeframe)
+        period_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        
+        if (last is None or store.size(symbol, timeframe) < min(limit, store.capacity)
+                or time.time() * 1000 - last > store.capacity * period_ms):
+            # Empty, shorter than requested or too far behind: rebuild from the full history
+            ohlcv = self._fetch_ohlcv(symbol, timeframe, limit=limit)
+            store.replace(symbol, timeframe, ohlcv)
+        else:
+            # Only the still-forming candle and anything newer
+            ohlcv = self._fetch_ohlcv(symbol, timeframe, since=last)
+            store.update(symbol, timeframe, ohlcv)
+        return store.frame(symbol, timeframe, limit)
+    
+    def market_memory_report(self) -> Dict:
+        """
+        Ring buffer memory (bytes) in total and per symbol
+        """
+        if self.market_store is None:
+            return {}
+        return {'total': self.market_store.nbytes, 'per_symbol': self.market_store.memory_by_symbol()}
+    
     def calculate_volume_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate Volume-based indicators
@@ -93,17 +257,17 @@ class CryptoSignalBot:
         df['volume_spike'] = df['volume_ratio'] > self.min_volume_spike
         
         # On Balance Volume (OBV)
-        df['obv'] = ta.volume.OnBalanceVolumeIndicator(df['close'], df['volume']).on_balance_volume()
+        df['obv'] = self.indicators.obv(df['close'], df['volume'])
         df['obv_ma'] = df['obv'].rolling(window=10).mean()
         df['obv_trend'] = df['obv'] > df['obv_ma']
         
         # Volume Price Trend (VPT)
-        df['vpt'] = ta.volume.VolumePriceTrendIndicator(df['close'], df['volume']).volume_price_trend()
+        df['vpt'] = self.indicators.vpt(df['close'], df['volume'])
         df['vpt_ma'] = df['vpt'].rolling(window=10).mean()
         df['vpt_trend'] = df['vpt'] > df['vpt_ma']
         
         # Money Flow Index (MFI)
-        df['mfi'] = ta.volume.MFIIndicator(df['high'], df['low'], df['close'], df['volume']).money_flow_index()
+        df['mfi'] = self.indicators.mfi(df['high'], df['low'], df['close'], df['volume'])
         
         return df
     
@@ -115,26 +279,20 @@ class CryptoSignalBot:
             return df
         
         # ATR
-        df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close'], window=14).average_true_range()
+        df['atr'] = self.indicators.atr(df['high'], df['low'], df['close'], window=14)
         
         # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
+        df['rsi'] = self.indicators.rsi(df['close'], window=14)
         
         # MACD
-        macd = ta.trend.MACD(df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_histogram'] = macd.macd_diff()
+        df['macd'], df['macd_signal'], df['macd_histogram'] = self.indicators.macd(df['close'])
         
         # Bollinger Bands
-        bb = ta.volatility.BollingerBands(df['close'])
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_lower'] = bb.bollinger_lband()
-        df['bb_middle'] = bb.bollinger_mavg()
+        df['bb_upper'], df['bb_lower'], df['bb_middle'] = self.indicators.bollinger(df['close'])
         
         # EMA
-        df['ema_20'] = ta.trend.EMAIndicator(df['close'], window=20).ema_indicator()
-        df['ema_50'] = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator()
+        df['ema_20'] = self.indicators.ema(df['close'], window=20)
+        df['ema_50'] = self.indicators.ema(df['close'], window=50)
         
         return df
     
@@ -150,8 +308,8 @@ class CryptoSignalBot:
         df_with_volume = self.calculate_volume_indicators(df_with_indicators)
         
         # Swing detection with volume
-        highs = df_with_volume['high'].rolling(window=5).max()
-        lows = df_with_volume['low'].rolling(window=5).min()
+        highs = pd.Series(self.indicators.rolling_max(df_with_volume['high'], 5), index=df_with_volume.index)
+        lows = pd.Series(self.indicators.rolling_min(df_with_volume['low'], 5), index=df_with_volume.index)
         
         # Enhanced trend detection
         recent_highs = highs.tail(10)
@@ -271,6 +429,13 @@ class CryptoSignalBot:
         
         return divergences[-3:]  # Last 3 divergences
     
+    def data_staleness(self, frames: Dict[str, pd.DataFrame]) -> float:
+        """
+        Worst data age across frames, in candles of each frame's timeframe
+        """
+        return max(df.attrs.get('data_age', 0.0) / ccxt.Exchange.parse_timeframe(timeframe)
+                   for timeframe, df in frames.items())
+    
     def enhanced_signal_scoring(self, symbol: str, df_15m: pd.DataFrame, 
                               df_1h: pd.DataFrame, df_4h: pd.DataFrame) -> Optional[Dict]:
         """
@@ -279,6 +444,13 @@ class CryptoSignalBot:
         if any(df.empty for df in [df_15m, df_1h, df_4h]):
             return None
         
+        # Stale inputs (exchange fallback): skip if too old, otherwise down-weight
+        staleness = self.data_staleness({'15m': df_15m, '1h': df_1h, '4h': df_4h})
+        if staleness > self.max_stale_candles:
+            print(f"⏭️ {symbol}: market data too stale ({staleness:.1f} candles), skipping")
+            return None
+        freshness = 1.0 - self.stale_penalty * staleness / self.max_stale_candles
+        
         # Market Structure Analysis
         structure_1h = self.detect_market_structure(df_1h)
         structure_4h = self.detect_market_structure(df_4h)
@@ -333,7 +505,7 @@ class CryptoSignalBot:
         if long_score >= 6:  # Stricter requirement
             return {
                 'signal_type': 'LONG',
-                'score': long_score / len(long_conditions),
+                'score': long_score / len(long_conditions) * freshness,
                 'conditions_met': {k: v for k, v in long_conditions.items() if v},
                 'structure_1h': structure_1h,
                 'structure_4h': structure_4h,
@@ -349,7 +521,7 @@ class CryptoSignalBot:
         elif short_score >= 6:  # Stricter requirement
             return {
                 'signal_type': 'SHORT',
-                'score': short_score / len(short_conditions),
+                'score': short_score / len(short_conditions) * freshness,
                 'conditions_met': {k: v for k, v in short_conditions.items() if v},
                 'structure_1h': structure_1h,
                 'structure_4h': structure_4h,
@@ -365,10 +537,23 @@ class CryptoSignalBot:
         
         return None
     
+    def refresh_sentiment(self, symbols: List[str] = None):
+        """
+        Start a background refresh of derivatives sentiment if its cadence is
+        due; the scan does not wait and scores against the cached snapshot.
+        Scores are relative to `sentiment_universe`, so a shard scanning a
+        slice of the pairs still ranks them against the whole market.
+        """
+        if self.sentiment is not None:
+            self.sentiment.refresh_in_background(symbols or self.sentiment_universe or self.trading_pairs)
+    
     def get_on_chain_sentiment(self, symbol: str) -> Dict:
         """
-        Fundamental and On-Chain Analysis (simplified)
+        Per-symbol derivatives sentiment from the cache (funding/open interest
+        z-scores). Without a provider, falls back to the market-wide Fear & Greed bucket.
         """
+        if self.sentiment is not None:
+            return self.sentiment.get(symbol)
         try:
             fear_greed = self.get_fear_greed_index()
             
@@ -451,57 +636,65 @@ class CryptoSignalBot:
             'risk_reward_ratio': round(abs(tp2 - entry_price) / abs(stop_loss - entry_price), 2)
         }
     
-    def track_signal_status(self, signal: Dict) -> Dict:
+    def track_signal_status(self, signal: SignalRecord) -> StatusRecord:
         """
         Track active signal status
         """
-        symbol = signal['symbol']
-        current_data = self.get_market_data(symbol, '15m', 20)
+        current_data = self.get_market_data(signal.symbol, '15m', 20)
         
         if current_data.empty:
-            return {'status': 'ERROR', 'message': 'Unable to fetch current data'}
+            return StatusRecord(SignalStatus.ERROR, message='Unable to fetch current data')
         
-        current_price = current_data.iloc[-1]['close']
-        entry_points = signal['entry_exit_points']
-        signal_type = signal['signal_type']
+        current_price = float(current_data.iloc[-1]['close'])
         
         # Check signal status
-        if signal_type == 'LONG':
-            if current_price <= entry_points['stop_loss']:
-                return {'status': 'STOPPED_OUT', 'current_price': current_price, 'pnl_percent': -2.0}
-            elif current_price >= entry_points['take_profit_3']:
-                return {'status': 'TP3_HIT', 'current_price': current_price, 'pnl_percent': 10.0}
-            elif current_price >= entry_points['take_profit_2']:
-                return {'status': 'TP2_HIT', 'current_price': current_price, 'pnl_percent': 6.0}
-            elif current_price >= entry_points['take_profit_1']:
-                return {'status': 'TP1_HIT', 'current_price': current_price, 'pnl_percent': 3.6}
-            elif current_price >= entry_points['entry_price']:
-                return {'status': 'IN_PROFIT', 'current_price': current_price, 'pnl_percent': ((current_price / entry_points['entry_price']) - 1) * 100}
+        if signal.signal_type == SignalType.LONG:
+            if current_price <= signal.stop_loss:
+                return StatusRecord(SignalStatus.STOPPED_OUT, current_price, pnl_percent=-2.0)
+            elif current_price >= signal.take_profit_3:
+                return StatusRecord(SignalStatus.TP3_HIT, current_price, pnl_percent=10.0)
+            elif current_price >= signal.take_profit_2:
+                return StatusRecord(SignalStatus.TP2_HIT, current_price, pnl_percent=6.0)
+            elif current_price >= signal.take_profit_1:
+                return StatusRecord(SignalStatus.TP1_HIT, current_price, pnl_percent=3.6)
+            elif current_price >= signal.entry_price:
+                return StatusRecord(SignalStatus.IN_PROFIT, current_price, pnl_percent=((current_price / signal.entry_price) - 1) * 100)
             else:
-                return {'status': 'WAITING_ENTRY', 'current_price': current_price, 'distance_to_entry': ((entry_points['entry_price'] / current_price) - 1) * 100}
+                return StatusRecord(SignalStatus.WAITING_ENTRY, current_price, distance_to_entry=((signal.entry_price / current_price) - 1) * 100)
         
         else:  # SHORT
-            if current_price >= entry_points['stop_loss']:
-                return {'status': 'STOPPED_OUT', 'current_price': current_price, 'pnl_percent': -2.0}
-            elif current_price <= entry_points['take_profit_3']:
-                return {'status': 'TP3_HIT', 'current_price': current_price, 'pnl_percent': 10.0}
-            elif current_price <= entry_points['take_profit_2']:
-                return {'status': 'TP2_HIT', 'current_price': current_price, 'pnl_percent': 6.0}
-            elif current_price <= entry_points['take_profit_1']:
-                return {'status': 'TP1_HIT', 'current_price': current_price, 'pnl_percent': 3.6}
-            elif current_price <= entry_points['entry_price']:
-                return {'status': 'IN_PROFIT', 'current_price': current_price, 'pnl_percent': ((entry_points['entry_price'] / current_price) - 1) * 100}
+            if current_price >= signal.stop_loss:
+                return StatusRecord(SignalStatus.STOPPED_OUT, current_price, pnl_percent=-2.0)
+            elif current_price <= signal.take_profit_3:
+                return StatusRecord(SignalStatus.TP3_HIT, current_price, pnl_percent=10.0)
+            elif current_price <= signal.take_profit_2:
+                return StatusRecord(SignalStatus.TP2_HIT, current_price, pnl_percent=6.0)
+            elif current_price <= signal.take_profit_1:
+                return StatusRecord(SignalStatus.TP1_HIT, current_price, pnl_percent=3.6)
+            elif current_price <= signal.entry_price:
+                return StatusRecord(SignalStatus.IN_PROFIT, current_price, pnl_percent=((signal.entry_price / current_price) - 1) * 100)
             else:
-                return {'status': 'WAITING_ENTRY', 'current_price': current_price, 'distance_to_entry': ((current_price / entry_points['entry_price']) - 1) * 100}
+                return StatusRecord(SignalStatus.WAITING_ENTRY, current_price, distance_to_entry=((current_price / signal.entry_price) - 1) * 100)
+    
+    def update_symbol_stats(self, symbol: str, df: pd.DataFrame):
+        """
+        Record last-24-candle traded value and volatility for scan prioritization
+        """
+        recent = df.tail(24)
+        volatility = recent['close'].pct_change().std()
+        self.symbol_stats[symbol] = {
+            'quote_volume': float((recent['close'] * recent['volume']).sum()),
+            'volatility': 0.0 if pd.isna(volatility) else float(volatility),
+        }
     
-    def generate_signal(self, symbol: str) -> Optional[Dict]:
+    def generate_signal(self, symbol: str) -> Optional[SignalRecord]:
         """
         Generate complete signal for a coin
         """
         # Skip if already have active signal for this symbol
         if symbol in self.active_signals:
             status = self.track_signal_status(self.active_signals[symbol])
-            if status['status'] not in ['STOPPED_OUT', 'TP3_HIT']:
+            if status.status not in CLOSED_STATUSES:
                 return None  # Don't generate new signal
             else:
                 # Remove completed signal
@@ -517,6 +710,8 @@ class CryptoSignalBot:
         if any(df.empty for df in [df_15m, df_1h, df_4h]):
             return None
         
+        self.update_symbol_stats(symbol, df_1h)
+        
         # Enhanced signal analysis
         signal_analysis = self.enhanced_signal_scoring(symbol, df_15m, df_1h, df_4h)
         
@@ -525,21 +720,9 @@ class CryptoSignalBot:
             entry_exit = self.calculate_entry_exit_points(df_1h, signal_analysis['signal_type'])
             
             if entry_exit and entry_exit.get('risk_reward_ratio', 0) >= self.min_rr_ratio:
-                signal = {
-                    'symbol': symbol,
-                    'signal_type': signal_analysis['signal_type'],
-                    'signal_strength': round(signal_analysis['score'], 2),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'current_price': df_1h.iloc[-1]['close'],
-                    'conditions_met': signal_analysis['conditions_met'],
-                    'market_structure_1h': signal_analysis['structure_1h'],
-                    'market_structure_4h': signal_analysis['structure_4h'],
-                    'sentiment': signal_analysis['sentiment'],
-                    'volume_analysis': signal_analysis['volume_analysis'],
-                    'entry_exit_points': entry_exit,
-                    'order_blocks': signal_analysis['order_blocks'],
-                    'divergences': signal_analysis['divergences']
-                }
+                # Compact record: only scalars are kept in active_signals
+                signal = SignalRecord.from_analysis(symbol, signal_analysis, entry_exit,
+                                                    df_1h.iloc[-1]['close'])
                 
                 # Add to active signals
                 self.active_signals[symbol] = signal
@@ -547,25 +730,57 @@ class CryptoSignalBot:
         
         return None
     
-    def scan_all_pairs(self) -> List[Dict]:
+    def prioritize_pairs(self) -> List[str]:
         """
-        Scan all coins and generate signals
+        Scan order: active signals, then pairs carried over from the last
+        cycle, then by recent traded value x volatility
+        """
+        carried = set(self.carry_over)
+        
+        def priority(pair: str):
+            stats = self.symbol_stats.get(pair, {})
+            activity = stats.get('quote_volume', 0.0) * stats.get('volatility', 0.0)
+            return (pair not in self.active_signals, pair not in carried, -activity)
+        
+        return sorted(self.trading_pairs, key=priority)
+    
+    def scan_all_pairs(self, deadline: float = None) -> List[SignalRecord]:
+        """
+        Scan all coins and generate signals.
+        With a deadline (epoch seconds), unscanned pairs carry over to the next cycle.
         """
         print("🚀 Starting market scan...")
         signals = []
-        
-        for pair in self.trading_pairs:
+        pairs = self.prioritize_pairs()
+        started = time.time()
+        self.carry_over = []
+        self.refresh_sentiment()
+        
+        for i, pair in enumerate(pairs):
+            if deadline is not None and time.time() >= deadline:
+                self.carry_over = pairs[i:]
+                print(f"⏱️ Deadline reached: {len(self.carry_over)} pairs carried over to next cycle")
+                break
             try:
                 signal = self.generate_signal(pair)
                 if signal:
                     signals.append(signal)
-                time.sleep(0.5)  # Prevent rate limiting
+                delay = self.request_delay
+                if deadline is not None:
+                    delay = min(delay, max(0.0, deadline - time.time()))
+                time.sleep(delay)  # Prevent rate limiting
             except Exception as e:
                 print(f"❌ Error analyzing {pair}: {e}")
                 continue
         
+        self.last_scan = {
+            'scanned': len(pairs) - len(self.carry_over),
+            'carried_over': len(self.carry_over),
+            'duration': time.time() - started,
+        }
+        
         # Sort by signal strength
-        signals.sort(key=lambda x: x['signal_strength'], reverse=True)
+        signals.sort(key=lambda x: x.signal_strength, reverse=True)
         return signals
     
     def update_active_signals(self):
@@ -580,62 +795,72 @@ class CryptoSignalBot:
         for symbol, signal in list(self.active_signals.items()):
             try:
                 status = self.track_signal_status(signal)
-                signal['current_status'] = status
+                signal.current_status = status
                 
                 # Print status update
-                if status['status'] in ['TP1_HIT', 'TP2_HIT', 'TP3_HIT']:
-                    print(f"🎯 {symbol} {signal['signal_type']}: {status['status']} | PnL: +{status['pnl_percent']:.1f}%")
-                elif status['status'] == 'STOPPED_OUT':
-                    print(f"🛑 {symbol} {signal['signal_type']}: STOPPED OUT | PnL: {status['pnl_percent']:.1f}%")
+                if status.status in (SignalStatus.TP1_HIT, SignalStatus.TP2_HIT, SignalStatus.TP3_HIT):
+                    print(f"🎯 {symbol} {signal.signal_type.value}: {status.status.value} | PnL: +{status.pnl_percent:.1f}%")
+                elif status.status == SignalStatus.STOPPED_OUT:
+                    print(f"🛑 {symbol} {signal.signal_type.value}: STOPPED OUT | PnL: {status.pnl_percent:.1f}%")
                     del self.active_signals[symbol]  # Remove stopped signals
-                elif status['status'] == 'IN_PROFIT':
-                    print(f"💚 {symbol} {signal['signal_type']}: IN PROFIT | PnL: +{status['pnl_percent']:.1f}%")
+                elif status.status == SignalStatus.IN_PROFIT:
+                    print(f"💚 {symbol} {signal.signal_type.value}: IN PROFIT | PnL: +{status.pnl_percent:.1f}%")
                 
                 # Remove completed signals
-                if status['status'] in ['TP3_HIT']:
+                if status.status == SignalStatus.TP3_HIT:
                     del self.active_signals[symbol]
                     
             except Exception as e:
                 print(f"❌ Error updating {symbol}: {e}")
     
-    def format_signal_output(self, signal: Dict) -> str:
+    def format_signal_output(self, signal: Union[SignalRecord, Dict]) -> str:
         """
         Format signal output
         """
-        conditions_text = "\n".join([f"• {k.replace('_', ' ').title()}" for k in signal['conditions_met'].keys()])
+        if isinstance(signal, dict):
+            signal = SignalRecord.from_signal(signal)
+        
+        conditions_text = "\n".join([f"• {k.replace('_', ' ').title()}" for k in signal.conditions_met])
+        fear_greed = signal.fear_greed_index if signal.fear_greed_index is not None else 'N/A'
+        funding = (f"{signal.funding_rate * 100:+.4f}% (z {signal.funding_z:+.2f})"
+                   if signal.funding_rate is not None else 'N/A')
+        open_interest = (f"{signal.oi_change * 100:+.2f}% (z {signal.oi_z:+.2f})"
+                         if signal.oi_change is not None else 'N/A')
         
         output = f"""
-🎯 {signal['signal_type']} SIGNAL - {signal['symbol']}
+🎯 {signal.signal_type.value} SIGNAL - {signal.symbol}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 📊 Signal Overview:
-• Strength: {signal['signal_strength']*100:.0f}%
-• Current Price: ${signal['current_price']:.4f}
-• Timestamp: {signal['timestamp']}
+• Strength: {signal.signal_strength*100:.0f}%
+• Current Price: ${signal.current_price:.4f}
+• Timestamp: {signal.timestamp_str}
 
 💰 Trading Levels:
-• Entry: ${signal['entry_exit_points']['entry_price']:.4f}
-• Stop Loss: ${signal['entry_exit_points']['stop_loss']:.4f}
-• Target 1: ${signal['entry_exit_points']['take_profit_1']:.4f}
-• Target 2: ${signal['entry_exit_points']['take_profit_2']:.4f}
-• Target 3: ${signal['entry_exit_points']['take_profit_3']:.4f}
-• Risk/Reward: 1:{signal['entry_exit_points']['risk_reward_ratio']}
+• Entry: ${signal.entry_price:.4f}
+• Stop Loss: ${signal.stop_loss:.4f}
+• Target 1: ${signal.take_profit_1:.4f}
+• Target 2: ${signal.take_profit_2:.4f}
+• Target 3: ${signal.take_profit_3:.4f}
+• Risk/Reward: 1:{signal.risk_reward_ratio}
 
 📈 Technical Analysis:
-• Trend 1H: {signal['market_structure_1h']['trend']} (Confidence: {signal['market_structure_1h']['confidence']:.1f})
-• Trend 4H: {signal['market_structure_4h']['trend']}
-• Order Blocks: {len(signal['order_blocks'])}
-• Divergences: {len(signal['divergences'])}
+• Trend 1H: {signal.trend_1h} (Confidence: {signal.confidence_1h:.1f})
+• Trend 4H: {signal.trend_4h}
+• Order Blocks: {signal.order_block_count}
+• Divergences: {signal.divergence_count}
 
 📊 Volume Analysis:
-• OBV Trend: {'Bullish' if signal['volume_analysis']['volume_trend'] else 'Bearish'}
-• Recent Volume Spike: {'Yes' if signal['volume_analysis']['recent_spike'] else 'No'}
-• MFI: {signal['volume_analysis']['mfi']:.1f}
+• OBV Trend: {'Bullish' if signal.volume_trend else 'Bearish'}
+• Recent Volume Spike: {'Yes' if signal.recent_spike else 'No'}
+• MFI: {signal.mfi:.1f}
 
 🔍 Market Sentiment:
-• Sentiment: {signal['sentiment']['sentiment']}
-• Score: {signal['sentiment']['score']}/100
-• Fear & Greed: {signal['sentiment'].get('fear_greed_index', 'N/A')}
+• Sentiment: {signal.sentiment}
+• Score: {signal.sentiment_score:g}/100
+• Funding Rate: {funding}
+• Open Interest Change: {open_interest}
+• Fear & Greed: {fear_greed}
 
 ✅ Conditions Met:
 {conditions_text}
@@ -650,81 +875,92 @@ class CryptoSignalBot:
         """
         return output
     
-    def format_signal_status(self, symbol: str, signal: Dict) -> str:
+    def format_signal_status(self, symbol: str, signal: Union[SignalRecord, Dict]) -> str:
         """
         Format active signal status
         """
-        status = signal.get('current_status', {})
+        if isinstance(signal, dict):
+            signal = SignalRecord.from_signal(signal)
+        
+        status = signal.current_status
         if not status:
             return f"❓ {symbol}: Status unknown"
         
         status_icons = {
-            'WAITING_ENTRY': '⏳',
-            'IN_PROFIT': '💚',
-            'TP1_HIT': '🎯',
-            'TP2_HIT': '🎯🎯',
-            'TP3_HIT': '🎯🎯🎯',
-            'STOPPED_OUT': '🛑'
+            SignalStatus.WAITING_ENTRY: '⏳',
+            SignalStatus.IN_PROFIT: '💚',
+            SignalStatus.TP1_HIT: '🎯',
+            SignalStatus.TP2_HIT: '🎯🎯',
+            SignalStatus.TP3_HIT: '🎯🎯🎯',
+            SignalStatus.STOPPED_OUT: '🛑'
         }
         
-        icon = status_icons.get(status['status'], '❓')
+        icon = status_icons.get(status.status, '❓')
+        signal_type = signal.signal_type.value
         
-        if status['status'] == 'WAITING_ENTRY':
-            return f"{icon} {symbol} {signal['signal_type']}: Waiting Entry | Distance: {status['distance_to_entry']:.2f}%"
-        elif 'pnl_percent' in status:
-            pnl_sign = '+' if status['pnl_percent'] > 0 else ''
-            return f"{icon} {symbol} {signal['signal_type']}: {status['status']} | PnL: {pnl_sign}{status['pnl_percent']:.1f}%"
+        if status.status == SignalStatus.WAITING_ENTRY:
+            return f"{icon} {symbol} {signal_type}: Waiting Entry | Distance: {status.distance_to_entry:.2f}%"
+        elif status.pnl_percent is not None:
+            pnl_sign = '+' if status.pnl_percent > 0 else ''
+            return f"{icon} {symbol} {signal_type}: {status.status.value} | PnL: {pnl_sign}{status.pnl_percent:.1f}%"
         else:
-            return f"{icon} {symbol} {signal['signal_type']}: {status['status']}"
+            return f"{icon} {symbol} {signal_type}: {status.status.value}"
+    
+    def run_scan_cycle(self, deadline: float = None) -> List[SignalRecord]:
+        """
+        One scan cycle: update active signals, scan pairs (until `deadline`), report
+        """
+        print(f"\n🔍 Scan - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # Update active signals first
+        self.update_active_signals()
+        
+        # Show active signals status
+        if self.active_signals:
+            print(f"\n📊 Active Signals ({len(self.active_signals)}):")
+            for symbol, signal in self.active_signals.items():
+                print(self.format_signal_status(symbol, signal))
+        
+        # Scan for new signals
+        new_signals = self.scan_all_pairs(deadline)
+        
+        if new_signals:
+            print(f"\n🎉 {len(new_signals)} NEW SIGNALS FOUND!")
+            for signal in new_signals:
+                print(self.format_signal_output(signal))
+                print("=" * 50)
+            
+            # Hand off to the background dispatcher (never blocks the scan)
+            if self.notifier:
+                self.notifier.submit(new_signals)
+        else:
+            print(f"⏳ No new signals found")
+        
+        # Summary
+        total_active = len(self.active_signals)
+        summary = f"\n📈 Summary: {total_active} active signals | {len(new_signals)} new signals"
+        if self.market_store is not None:
+            summary += f" | market data {self.market_store.nbytes / 1e6:.1f} MB"
+        print(summary)
+        return new_signals
     
     def run_continuous_scan(self, interval_minutes: int = 30):
         """
-        Continuous market scanning with active signal tracking
+        Continuous market scanning with active signal tracking.
+        Runs are aligned to candle closes and bounded by the next run.
         """
+        from scheduler import ScanScheduler
+        
         print(f"🔄 Starting continuous scan every {interval_minutes} minutes...")
         print("📊 Active signal tracking enabled")
         
-        scan_count = 0
-        
-        while True:
-            try:
-                scan_count += 1
-                print(f"\n🔍 Scan #{scan_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Update active signals first
-                self.update_active_signals()
-                
-                # Show active signals status
-                if self.active_signals:
-                    print(f"\n📊 Active Signals ({len(self.active_signals)}):")
-                    for symbol, signal in self.active_signals.items():
-                        print(self.format_signal_status(symbol, signal))
-                
-                # Scan for new signals
-                new_signals = self.scan_all_pairs()
-                
-                if new_signals:
-                    print(f"\n🎉 {len(new_signals)} NEW SIGNALS FOUND!")
-                    for signal in new_signals:
-                        print(self.format_signal_output(signal))
-                        print("=" * 50)
-                else:
-                    print(f"⏳ No new signals found")
-                
-                # Summary
-                total_active = len(self.active_signals)
-                print(f"\n📈 Summary: {total_active} active signals | {len(new_signals)} new signals")
-                
-                # Wait for next scan
-                print(f"⏰ Next scan in {interval_minutes} minutes...")
-                time.sleep(interval_minutes * 60)
-                
-            except KeyboardInterrupt:
-                print("\n⏹️ Scan stopped by user!")
-                break
-            except Exception as e:
-                print(f"❌ Scan error: {e}")
-                time.sleep(60)  # Wait 1 minute before retry
+        scan = ScanScheduler(self, period_seconds=interval_minutes * 60)
+        try:
+            scan.run_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️ Scan stopped by user!")
+        finally:
+            scan.stop()
     
     def show_performance_summary(self):
         """
@@ -737,7 +973,7 @@ class CryptoSignalBot:
         print("• Average RR: Calculate from winning trades")
         print("• Max Drawdown: Track from trading history")
     
-    def export_signals_to_json(self, signals: List[Dict], filename: str = None):
+    def export_signals_to_json(self, signals: List[SignalRecord], filename: str = None):
         """
         Export signals to JSON file
         """
@@ -746,7 +982,7 @@ class CryptoSignalBot:
         
         try:
             with open(filename, 'w') as f:
-                json.dump(signals, f, indent=2, default=str)
+                json.dump([signal.to_dict() for signal in signals], f, indent=2, default=str)
             print(f"📁 Signals exported to {filename}")
         except Exception as e:
             print(f"❌ Export error: {e}")
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Derivatives Sentiment
+Per-symbol sentiment from perpetual futures positioning. Funding rates for
+the whole universe come from one bulk call, open interest on a slower
+cadence; both are refreshed on a background thread, cached and turned into
+cross-sectional z-scores so the scan only reads from memory.
+"""
+
+import json
+import os
+import random
+import statistics
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+from lazy_imports import lazy_import
+from resilience import CircuitOpenError
+
+ccxt = lazy_import('ccxt')
+
+NEUTRAL = {'sentiment': 'NEUTRAL', 'score': 50}
+
+
+class IncompleteRefresh(Exception):
+    """
+    A per-symbol refresh stopped early; carries what was fetched and what is left
+    """
+
+    def __init__(self, message: str, partial: Dict[str, float], missing: List[str]):
+        super().__init__(message)
+        self.partial = partial
+        self.missing = missing
+
+
+def robust_zscores(values: Dict[str, float]) -> Dict[str, float]:
+    """
+    Cross-sectional z-scores using median/MAD (std if MAD is 0)
+    """
+    if len(values) < 3:
+        return {symbol: 0.0 for symbol in values}
+    samples = list(values.values())
+    center = statistics.median(samples)
+    scale = 1.4826 * statistics.median(abs(v - center) for v in samples)
+    if not scale:
+        scale = statistics.pstdev(samples)
+    if not scale:
+        return {symbol: 0.0 for symbol in values}
+    return {symbol: (value - center) / scale for symbol, value in values.items()}
+
+
+class ExchangeDerivativesSource:
+    """
+    Funding rates and open interest from a ccxt futures exchange (Binance USD-M by default).
+    Spot symbols like 'BTC/USDT' map to the linear perpetual 'BTC/USDT:USDT'.
+    """
+
+    def __init__(self, exchange_id: str = 'binanceusdm', caller=None):
+        """
+        caller: optional ResilientCaller the requests go through
+        """
+        self.exchange_id = exchange_id
+        self.caller = caller
+        self._exchange = None
+
+    @property
+    def exchange(self):
+        if self._exchange is None:
+            self._exchange = getattr(ccxt, self.exchange_id)({'enableRateLimit': True, 'timeout': 10000})
+        return self._exchange
+
+    def _call(self, endpoint: str, fn: Callable, *args):
+        if self.caller is None:
+            return fn(*args)
+        return self.caller.call(endpoint, fn, *args)
+
+    @staticmethod
+    def perp_symbol(symbol: str) -> str:
+        return symbol if ':' in symbol else f"{symbol}:{symbol.split('/')[1]}"
+
+    def funding_rates(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Current funding rate per symbol, one request for the whole universe
+        """
+        perps = {self.perp_symbol(symbol): symbol for symbol in symbols}
+        rates = self._call('funding_rates', self.exchange.fetch_funding_rates)
+        return {perps[perp]: float(data['fundingRate'])
+                for perp, data in rates.items()
+                if perp in perps and data.get('fundingRate') is not None}
+
+    def open_interest(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Open interest (quote value where available) per symbol. Bulk when the
+        exchange supports it, otherwise one request per symbol.
+        Raises IncompleteRefresh with the partial result if the breaker opens midway.
+        """
+        perps = {self.perp_symbol(symbol): symbol for symbol in symbols}
+        result = {}
+        if self.exchange.has.get('fetchOpenInterests'):
+            entries = self._call('open_interest', self.exchange.fetch_open_interests, list(perps))
+            for entry in entries.values():
+                self._add_open_interest(result, perps, entry)
+            return result
+
+        for i, perp in enumerate(perps):
+            try:
+                entry = self._call('open_interest', self.exchange.fetch_open_interest, perp)
+            except CircuitOpenError as e:
+                missing = [perps[p] for p in list(perps)[i:]]
+                raise IncompleteRefresh(f"open interest stopped with {len(missing)} symbols left: {e}",
+                                        result, missing)
+            except Exception as e:
+                # Unlisted perps and single failures just leave the symbol out
+                print(f"⚠️ Open interest unavailable for {perp}: {e}")
+                continue
+            self._add_open_interest(result, perps, entry)
+        return result
+
+    @staticmethod
+    def _add_open_interest(result: Dict[str, float], perps: Dict[str, str], entry: Dict):
+        value = entry.get('openInterestValue') or entry.get('openInterestAmount')
+        if entry.get('symbol') in perps and value:
+            result[perps[entry['symbol']]] = float(value)
+
+
+class StaticDerivativesSource:
+    """
+    Local stand-in for offline runs and tests: serves fixed (or synthetic,
+    slowly drifting) funding rates and open interest without any network.
+    """
+
+    def __init__(self, funding: Dict[str, float] = None, open_interest: Dict[str, float] = None,
+                 drift: bool = False, seed: int = 0):
+        self.funding = dict(funding or {})
+        self.oi = dict(open_interest or {})
+        self.drift = drift
+        self.seed = seed
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def synthetic(cls, symbols: Iterable[str] = (), seed: int = 0) -> 'StaticDerivativesSource':
+        """
+        Deterministic per-symbol values that random-walk on every refresh;
+        symbols asked for later are generated on first use
+        """
+        source = cls(drift=True, seed=seed)
+        source._add_synthetic(symbols)
+        return source
+
+    def _add_synthetic(self, symbols: Iterable[str]):
+        for symbol in symbols:
+            if symbol not in self.funding:
+                rng = random.Random(zlib.crc32(symbol.encode()) + self.seed)
+                self.funding[symbol] = rng.gauss(0.0001, 0.0002)
+                self.oi[symbol] = rng.uniform(5e6, 5e8)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'StaticDerivativesSource':
+        """
+        JSON file: {"funding": {"BTC/USDT": 0.0001, ...}, "open_interest": {...}}
+        """
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('funding'), data.get('open_interest'))
+
+    def funding_rates(self, symbols: List[str]) -> Dict[str, float]:
+        self.calls += 1
+        if self.drift:
+            self._add_synthetic(symbols)
+            for symbol in self.funding:
+                self.funding[symbol] += self._rng.gauss(0.0, 0.00005)
+        return {symbol: self.funding[symbol] for symbol in symbols if symbol in self.funding}
+
+    def open_interest(self, symbols: List[str]) -> Dict[str, float]:
+        self.calls += 1
+        if self.drift:
+            self._add_synthetic(symbols)
+            for symbol in self.oi:
+                self.oi[symbol] *= 1 + self._rng.gauss(0.0, 0.03)
+        return {symbol: self.oi[symbol] for symbol in symbols if symbol in self.oi}
+
+
+class DerivativesSentiment:
+    def __init__(self, source, funding_interval: float = 300.0, oi_interval: float = 900.0,
+                 max_age: float = None, market_index: Callable[[], Optional[int]] = None):
+        """
+        source: ExchangeDerivativesSource or StaticDerivativesSource
+        funding_interval / oi_interval: refresh cadence (seconds)
+        max_age: cached values older than this read as NEUTRAL (default 3 x funding_interval)
+        market_index: optional market-wide gauge (Fear & Greed), fetched once per refresh
+        """
+        self.source = source
+        self.funding_interval = funding_interval
+        self.oi_interval = oi_interval
+        self.max_age = max_age if max_age is not None else 3 * funding_interval
+        self.market_index = market_index
+
+        self.funding: Dict[str, float] = {}
+        self.open_interest: Dict[str, float] = {}
+        self.oi_change: Dict[str, float] = {}
+        self.fear_greed: Optional[int] = None
+        self.snapshot: Dict[str, Dict] = {}
+        self.funding_updated = 0.0
+        self.oi_updated = 0.0
+        self.oi_pending: List[str] = []  # symbols left over by an interrupted open interest refresh
+        self.metrics = {'refreshes': 0, 'errors': 0, 'last_duration': None}
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, caller=None, market_index: Callable = None) -> Optional['DerivativesSentiment']:
+        """
+        DERIVATIVES_SOURCE: ccxt exchange id (default binanceusdm), 'synthetic',
+        a path to a JSON file, or 'off'. Cadence from DERIVATIVES_REFRESH (s).
+        """
+        name = os.getenv('DERIVATIVES_SOURCE', 'binanceusdm')
+        if name.lower() in ('', 'off', 'none'):
+            return None
+        if name == 'synthetic':
+            source = StaticDerivativesSource.synthetic()
+        elif name.endswith('.json'):
+            source = StaticDerivativesSource.from_file(name)
+        else:
+            source = ExchangeDerivativesSource(name, caller)
+        interval = float(os.getenv('DERIVATIVES_REFRESH', 300))
+        return cls(source, funding_interval=interval, oi_interval=3 * interval, market_index=market_index)
+
+    def due(self, now: float = None) -> Dict[str, bool]:
+        now = time.time() if now is None else now
+        return {
+            'funding': now - self.funding_updated >= self.funding_interval,
+            'open_interest': bool(self.oi_pending) or now - self.oi_updated >= self.oi_interval,
+        }
+
+    def refresh_if_due(self, symbols: List[str], now: float = None) -> bool:
+        """
+        Refresh whatever is due (blocking); returns True if anything was fetched
+        """
+        due = self.due(now)
+        if not any(due.values()):
+            return False
+        self.refresh(symbols, now=now, **due)
+        return True
+
+    def refresh_in_background(self, symbols: List[str]) -> bool:
+        """
+        Run refresh_if_due on a daemon thread unless one is still running.
+        Readers keep the current snapshot until the new one is swapped in.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        if not any(self.due().values()):
+            return False
+        self._thread = threading.Thread(target=self._background_refresh, args=(list(symbols),),
+                                        name='derivatives-sentiment', daemon=True)
+        self._thread.start()
+        return True
+
+    def _background_refresh(self, symbols: List[str]):
+        try:
+            self.refresh_if_due(symbols)
+            print(f"🧭 Derivatives sentiment refreshed: {len(self.snapshot)} pairs "
+                  f"({self.metrics['last_duration']:.2f}s)")
+        except Exception as e:
+            self.metrics['errors'] += 1
+            print(f"⚠️ Sentiment refresh error: {e}")
+
+    def wait(self, timeout: float = None):
+        """
+        Wait for a background refresh to finish
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def refresh(self, symbols: List[str], funding: bool = True, open_interest: bool = True,
+                now: float = None):
+        """
+        Fetch in bulk and rebuild the per-symbol snapshot. A failed fetch keeps the previous values.
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+
+        if funding:
+            try:
+                self.funding = self.source.funding_rates(symbols)
+                self.funding_updated = now
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"⚠️ Funding rate refresh failed: {e}")
+            if self.market_index is not None:
+                self.fear_greed = self.market_index()
+
+        if open_interest:
+            # After an interrupted refresh only the symbols it missed are fetched
+            targets = [s for s in self.oi_pending if s in symbols] or symbols
+            current, complete = None, False
+            try:
+                current = self.source.open_interest(targets)
+                complete = True
+            except IncompleteRefresh as e:
+                self.metrics['errors'] += 1
+                current, self.oi_pending = e.partial, e.missing
+                print(f"⚠️ Open interest refresh incomplete: {e}")
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"⚠️ Open interest refresh failed: {e}")
+            if current is not None:
+                # Merge, so symbols not fetched this time keep their baseline
+                self.oi_change.update({symbol: value / self.open_interest[symbol] - 1.0
+                                       for symbol, value in current.items()
+                                       if self.open_interest.get(symbol)})
+                self.open_interest.update(current)
+            if complete:
+                self.oi_pending = []
+                self.oi_updated = now
+
+        self.snapshot = self._score()
+        self.metrics['refreshes'] += 1
+        self.metrics['last_duration'] = round(time.perf_counter() - started, 4)
+
+    def _score(self) -> Dict[str, Dict]:
+        funding_z = robust_zscores(self.funding)
+        oi_z = robust_zscores(self.oi_change)
+        snapshot = {}
+        for symbol, rate in self.funding.items():
+            fz = funding_z[symbol]
+            oz = oi_z.get(symbol, 0.0)
+            # Contrarian: crowded longs (rich funding) read bearish, crowded shorts bullish.
+            # Open interest building on the crowded side makes it stronger.
+            crowding = fz + 0.5 * oz * (1 if fz >= 0 else -1)
+            score = max(0.0, min(100.0, 50.0 - 15.0 * crowding))
+
+            if crowding > 2:
+                sentiment = 'EXTREME_GREED'
+            elif crowding > 2 / 3:
+                sentiment = 'GREED'
+            elif crowding < -2:
+                sentiment = 'EXTREME_FEAR'
+            elif crowding < -2 / 3:
+                sentiment = 'FEAR'
+            else:
+                sentiment = 'NEUTRAL'
+
+            snapshot[symbol] = {
+                'sentiment': sentiment,
+                'score': round(score, 1),
+                'funding_rate': rate,
+                'funding_z': round(fz, 3),
+                'oi_change': round(self.oi_change[symbol], 5) if symbol in self.oi_change else None,
+                'oi_z': round(oz, 3) if symbol in oi_z else None,
+                'fear_greed_index': self.fear_greed,
+            }
+        return snapshot
+
+    def get(self, symbol: str, now: float = None) -> Dict:
+        """
+        Cached sentiment for a symbol (no network); NEUTRAL if unknown or too old
+        """
+        now = time.time() if now is None else now
+        if now - self.funding_updated > self.max_age:
+            return dict(NEUTRAL)
+        return dict(self.snapshot.get(symbol, NEUTRAL))
+
+    def report(self) -> Dict:
+        return {
+            **self.metrics,
+            'symbols': len(self.snapshot),
+            'funding_age': round(time.time() - self.funding_updated, 1) if self.funding_updated else None,
+            'oi_age': round(time.time() - self.oi_updated, 1) if self.oi_updated else None,
+            'oi_pending': len(self.oi_pending),
+        }
+
+
+if __name__ == '__main__':
+    # Offline demo: synthetic universe, two refreshes so open interest changes show up
+    universe = [f"SYM{i:03d}/USDT" for i in range(12)]
+    provider = DerivativesSentiment(StaticDerivativesSource.synthetic(universe), oi_interval=0)
+    provider.refresh(universe)
+    provider.refresh(universe)
+    for symbol in universe:
+        data = provider.get(symbol)
+        print(f"{symbol}: {data['sentiment']:<13} score {data['score']:5.1f} | "
+              f"funding {data['funding_rate'] * 100:+.4f}% (z {data['funding_z']:+.2f}) | "
+              f"OI {data['oi_change'] * 100:+.2f}% (z {data['oi_z']:+.2f})")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indicator Backends
+Pure-NumPy kernels for every indicator the bot uses, plus a `ta` backend
+with the same interface. Select with INDICATOR_BACKEND=numpy|ta.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Dict, Tuple
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+ta = lazy_import('ta')
+
+DEFAULT_BACKEND = os.getenv('INDICATOR_BACKEND', 'ta')
+
+# Keep d**-k well inside float64 range when solving the EMA recurrence in blocks
+_MAX_BLOCK = 512
+
+# `ta` keeps float32 input in float32 (so its cumulative OBV/VPT sums round at
+# that precision) while the NumPy kernels always compute in float64; on float32
+# frames the backends agree to this fraction of each series' magnitude
+FLOAT32_RTOL = 1e-4
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _recurrence(x: np.ndarray, alpha: float, y_prev: float) -> np.ndarray:
+    """
+    Solve y[i] = (1 - alpha) * y[i-1] + alpha * x[i] without a Python loop
+    """
+    decay = 1.0 - alpha
+    out = np.empty_like(x)
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    block = int(min(_MAX_BLOCK, max(1, 300.0 / -np.log(decay))))
+    powers = decay ** np.arange(1, block + 1)
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        pw = powers[:len(chunk)]
+        out[start:start + len(chunk)] = pw * (y_prev + alpha * np.cumsum(chunk / pw))
+        y_prev = out[start + len(chunk) - 1]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    pandas `ewm(alpha=..., adjust=False, min_periods=...).mean()` for series
+    that only have leading NaNs
+    """
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    first = valid[0]
+    out[first] = x[first]
+    out[first + 1:] = _recurrence(x[first + 1:], alpha, x[first])
+    out[first:first + max(min_periods, 1) - 1] = np.nan
+    return out
+
+
+def _windows(x: np.ndarray, window: int) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(x, window)
+
+
+def _pad(values: np.ndarray, length: int) -> np.ndarray:
+    out = np.full(length, np.nan)
+    out[length - len(values):] = values
+    return out
+
+
+def ema(close, window: int) -> np.ndarray:
+    x = _as_array(close)
+    return _ewm(x, 2.0 / (window + 1), window)
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    x = _as_array(close)
+    diff = np.empty_like(x)
+    diff[0] = 0.0
+    diff[1:] = np.diff(x)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = _ewm(up, 1.0 / window, window)
+    ema_down = _ewm(down, 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100.0 - (100.0 / (1.0 + ema_up / ema_down)))
+
+
+def macd(close, window_slow: int = 26, window_fast: int = 12,
+         window_sign: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (macd, signal, histogram)
+    """
+    x = _as_array(close)
+    line = ema(x, window_fast) - ema(x, window_slow)
+    signal = _ewm(line, 2.0 / (window_sign + 1), window_sign)
+    return line, signal, line - signal
+
+
+def bollinger(close, window: int = 20,
+              window_dev: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (upper, lower, middle)
+    """
+    x = _as_array(close)
+    if len(x) < window:
+        empty = np.full(len(x), np.nan)
+        return empty, empty.copy(), empty.copy()
+    windows = _windows(x, window)
+    middle = _pad(windows.mean(axis=1), len(x))
+    std = _pad(windows.std(axis=1), len(x))
+    return middle + window_dev * std, middle - window_dev * std, middle
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    true_range = h - l
+    true_range[1:] = np.maximum(true_range[1:], np.maximum(np.abs(h[1:] - c[:-1]),
+                                                           np.abs(l[1:] - c[:-1])))
+    out = np.zeros(len(c))
+    if len(c) < window:
+        return out
+    out[window - 1] = true_range[:window].mean()
+    out[window:] = _recurrence(true_range[window:], 1.0 / window, out[window - 1])
+    return out
+
+
+def obv(close, volume) -> np.ndarray:
+    c, v = _as_array(close), _as_array(volume)
+    signed = v.copy()
+    signed[1:] = np.where(c[1:] < c[:-1], -v[1:], v[1:])
+    return np.cumsum(signed)
+
+
+def vpt(close, volume) -> np.ndarray:
+    c, v = _as_array(close), _as_array(volume)
+    out = np.full(len(c), np.nan)
+    out[1:] = np.cumsum((c[1:] / c[:-1] - 1.0) * v[1:])
+    return out
+
+
+def mfi(high, low, close, volume, window: int = 14) -> np.ndarray:
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3.0
+    direction = np.zeros(len(typical))
+    direction[1:] = np.sign(np.diff(typical))
+    flow = typical * _as_array(volume) * direction
+    if len(flow) < window:
+        return np.full(len(flow), np.nan)
+    windows = _windows(flow, window)
+    positive = np.where(windows >= 0.0, windows, 0.0).sum(axis=1)
+    negative = np.abs(np.where(windows < 0.0, windows, 0.0).sum(axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = positive / negative
+    return _pad(100.0 - (100.0 / (1.0 + ratio)), len(flow))
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    x = _as_array(values)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    return _pad(_windows(x, window).max(axis=1), len(x))
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    x = _as_array(values)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    return _pad(_windows(x, window).min(axis=1), len(x))
+
+
+class NumpyBackend:
+    """
+    Indicators computed on raw float arrays
+    """
+    name = 'numpy'
+
+    def atr(self, high, low, close, window: int = 14):
+        return atr(high, low, close, window)
+
+    def rsi(self, close, window: int = 14):
+        return rsi(close, window)
+
+    def macd(self, close):
+        return macd(close)
+
+    def bollinger(self, close):
+        return bollinger(close)
+
+    def ema(self, close, window: int):
+        return ema(close, window)
+
+    def obv(self, close, volume):
+        return obv(close, volume)
+
+    def vpt(self, close, volume):
+        return vpt(close, volume)
+
+    def mfi(self, high, low, close, volume, window: int = 14):
+        return mfi(high, low, close, volume, window)
+
+    def rolling_max(self, values, window: int):
+        return rolling_max(values, window)
+
+    def rolling_min(self, values, window: int):
+        return rolling_min(values, window)
+
+
+class TaBackend:
+    """
+    Reference implementation on top of the `ta` library
+    """
+    name = 'ta'
+
+    def atr(self, high, low, close, window: int = 14):
+        return ta.volatility.AverageTrueRange(high, low, close, window=window).average_true_range()
+
+    def rsi(self, close, window: int = 14):
+        return ta.momentum.RSIIndicator(close, window=window).rsi()
+
+    def macd(self, close):
+        indicator = ta.trend.MACD(close)
+        return indicator.macd(), indicator.macd_signal(), indicator.macd_diff()
+
+    def bollinger(self, close):
+        bb = ta.volatility.BollingerBands(close)
+        return bb.bollinger_hband(), bb.bollinger_lband(), bb.bollinger_mavg()
+
+    def ema(self, close, window: int):
+        return ta.trend.EMAIndicator(close, window=window).ema_indicator()
+
+    def obv(self, close, volume):
+        return ta.volume.OnBalanceVolumeIndicator(close, volume).on_balance_volume()
+
+    def vpt(self, close, volume):
+        return ta.volume.VolumePriceTrendIndicator(close, volume).volume_price_trend()
+
+    def mfi(self, high, low, close, volume, window: int = 14):
+        return ta.volume.MFIIndicator(high, low, close, volume, window=window).money_flow_index()
+
+    def rolling_max(self, values, window: int):
+        return values.rolling(window=window).max()
+
+    def rolling_min(self, values, window: int):
+        return values.rolling(window=window).min()
+
+
+BACKENDS = {
+    'numpy': NumpyBackend,
+    'ta': TaBackend,
+}
+
+
+def get_backend(name: str = None):
+    """
+    Instantiate an indicator backend by name
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+def _outputs(backend, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    high, low, close, volume = df['high'], df['low'], df['close'], df['volume']
+    outputs = {
+        'atr': backend.atr(high, low, close),
+        'rsi': backend.rsi(close),
+        'ema_20': backend.ema(close, 20),
+        'ema_50': backend.ema(close, 50),
+        'obv': backend.obv(close, volume),
+        'vpt': backend.vpt(close, volume),
+        'mfi': backend.mfi(high, low, close, volume),
+        'rolling_max': backend.rolling_max(high, 5),
+        'rolling_min': backend.rolling_min(low, 5),
+    }
+    outputs.update(zip(('macd', 'macd_signal', 'macd_histogram'), backend.macd(close)))
+    outputs.update(zip(('bb_upper', 'bb_lower', 'bb_middle'), backend.bollinger(close)))
+    return {k: np.asarray(v, dtype=np.float64) for k, v in outputs.items()}
+
+
+def cross_check(df: pd.DataFrame, rtol: float = 1e-7, atol: float = 1e-9) -> Dict[str, float]:
+    """
+    Compare NumPy kernels with `ta` on one OHLCV frame.
+    Returns the max absolute difference per indicator; raises on mismatch.
+    On float32 frames the tolerance is FLOAT32_RTOL of each series' scale.
+    """
+    expected = _outputs(TaBackend(), df)
+    actual = _outputs(NumpyBackend(), df)
+    low_precision = any(dtype == np.float32 for dtype in df.dtypes)
+    diffs = {}
+    for key, ref in expected.items():
+        tolerance = atol
+        if low_precision:
+            tolerance = max(atol, FLOAT32_RTOL * float(np.nanmax(np.abs(ref), initial=0.0)))
+        if not np.allclose(actual[key], ref, rtol=rtol, atol=tolerance, equal_nan=True):
+            raise AssertionError(f"{key}: numpy backend disagrees with ta")
+        both = ~np.isnan(ref)
+        diffs[key] = float(np.max(np.abs(actual[key][both] - ref[both]), initial=0.0))
+    return diffs
+
+
+def synthetic_ohlcv(length: int = 100, seed: int = 0) -> pd.DataFrame:
+    """
+    Random-walk OHLCV frame for checks and benchmarks
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    spread = np.abs(rng.normal(0, 0.005, length)) * close
+    volume = rng.lognormal(10, 0.5, length) * np.where(rng.random(length) < 0.1, 3.0, 1.0)
+    index = pd.date_range('2024-01-01', periods=length, freq='h')
+    return pd.DataFrame({
+        'open': np.r_[close[0], close[:-1]],
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': volume,
+    }, index=index)
+
+
+def benchmark(length: int = 100, rounds: int = 200) -> Dict[str, float]:
+    """
+    Mean seconds per symbol (all indicators on one frame) for each backend
+    """
+    df = synthetic_ohlcv(length)
+    results = {}
+    for name in BACKENDS:
+        backend = get_backend(name)
+        _outputs(backend, df)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            _outputs(backend, df)
+        results[name] = (time.perf_counter() - start) / rounds
+    return results
+
+
+if __name__ == '__main__':
+    for length in (100, 500):
+        cross_check(synthetic_ohlcv(length, seed=length))
+        timings = benchmark(length)
+        print(f"📏 {length} candles: ta {timings['ta']*1e3:.2f} ms | "
+              f"numpy {timings['numpy']*1e3:.2f} ms | "
+              f"speedup x{timings['ta'] / timings['numpy']:.1f}")
+    print("✅ NumPy kernels match ta")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lazy Imports
+Module proxies that import on first attribute access and record how long
+each import took, so cold starts only pay for what they use.
+"""
+
+import importlib
+import time
+import types
+from typing import Dict
+
+# module name -> seconds spent importing it
+IMPORT_TIMES: Dict[str, float] = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module until one of its attributes is used
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def _load(self):
+        start = time.perf_counter()
+        module = importlib.import_module(self.__name__)
+        IMPORT_TIMES[self.__name__] = time.perf_counter() - start
+        # Copy the real namespace so later lookups skip __getattr__
+        self.__dict__.update(module.__dict__)
+        self.__dict__['_lazy_loaded'] = True
+        return module
+
+    def __getattr__(self, attr: str):
+        if self.__dict__['_lazy_loaded']:
+            raise AttributeError(f"module '{self.__name__}' has no attribute '{attr}'")
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_loaded'] else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+_PROXIES: Dict[str, LazyModule] = {}
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Return a shared lazy proxy for `name`
+    """
+    if name not in _PROXIES:
+        _PROXIES[name] = LazyModule(name)
+    return _PROXIES[name]
+
+
+def import_times() -> Dict[str, float]:
+    """
+    Seconds spent importing each lazily loaded module so far
+    """
+    return {name: round(seconds, 4) for name, seconds in IMPORT_TIMES.items()}
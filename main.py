@@ -1,13 +1,37 @@
+import time
+_process_start = time.perf_counter()
+
 from fastapi import FastAPI
 from scheduler import start_scheduler
+from lazy_imports import import_times
 
 app = FastAPI()
+startup_timings = {'module_import': round(time.perf_counter() - _process_start, 4)}
+scan_scheduler = None
 
 @app.on_event("startup")
 async def startup_event():
-    start_scheduler()
-    print("🚀 Bot + Analyzer started")
+    # Only schedules jobs; the bot and its heavy imports load on the first run
+    global scan_scheduler
+    scan_scheduler = start_scheduler()
+    startup_timings['ready'] = round(time.perf_counter() - _process_start, 4)
+    print(f"🚀 Bot + Analyzer started in {startup_timings['ready']:.3f}s")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop scheduling and deliver alerts still queued in the dispatcher
+    if scan_scheduler:
+        scan_scheduler.stop()
 
 @app.get("/")
 def root():
     return {"status": "Bot is running"}
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "startup": startup_timings,
+        "imports": import_times(),
+        "scans": scan_scheduler.report() if scan_scheduler else None,
+    }
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Market Data Ring Buffers
+Fixed-capacity OHLCV storage per (symbol, timeframe): int64 epoch-ms
+timestamps plus float64/float32 prices and volumes. Rows are written twice
+(at i and i + capacity) so the newest N rows are always one contiguous
+slice, which lets DataFrames wrap the buffer without copying.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class OHLCVRingBuffer:
+    def __init__(self, capacity: int = 500, dtype: str = 'float64'):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((2 * capacity, len(OHLCV_COLUMNS)), dtype=self.dtype)
+        self._head = 0  # next write position in [0, capacity)
+        self.size = 0
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if not self.size:
+            return None
+        return int(self._timestamps[(self._head - 1) % self.capacity])
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def _write(self, timestamps, values):
+        positions = (self._head + np.arange(len(timestamps))) % self.capacity
+        for offset in (0, self.capacity):
+            self._timestamps[positions + offset] = timestamps
+            self._values[positions + offset] = values
+        self._head = int((positions[-1] + 1) % self.capacity)
+        self.size = min(self.capacity, self.size + len(timestamps))
+
+    def append(self, rows: List[List[float]]) -> int:
+        """
+        Add ccxt OHLCV rows; a row with the latest timestamp replaces the
+        last (still forming) candle, older rows are ignored.
+        Returns the number of new candles.
+        """
+        if not rows:
+            return 0
+        data = np.asarray(rows, dtype=np.float64)
+        timestamps = data[:, 0].astype(np.int64)
+        values = data[:, 1:6]
+
+        last = self.last_timestamp
+        if last is not None:
+            same = timestamps == last
+            if same.any():
+                index = (self._head - 1) % self.capacity
+                row = values[np.flatnonzero(same)[-1]]
+                self._values[index] = row
+                self._values[index + self.capacity] = row
+            newer = timestamps > last
+            timestamps, values = timestamps[newer], values[newer]
+
+        if len(timestamps) > self.capacity:
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+        if len(timestamps):
+            self._write(timestamps, values)
+        return len(timestamps)
+
+    def reset(self, rows: List[List[float]]) -> int:
+        """
+        Replace the contents with ccxt OHLCV rows (e.g. a longer full history,
+        which append() would drop as older than the last candle)
+        """
+        self._head = 0
+        self.size = 0
+        if not rows:
+            return 0
+        data = np.asarray(rows, dtype=np.float64)[-self.capacity:]
+        self._write(data[:, 0].astype(np.int64), data[:, 1:6])
+        return len(data)
+
+    def view(self, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy (timestamps, values) views of the newest `limit` rows.
+        Views stay valid until the next append.
+        """
+        n = self.size if limit is None else min(limit, self.size)
+        end = self._head + self.capacity
+        return self._timestamps[end - n:end], self._values[end - n:end]
+
+    def frame(self, limit: int = None) -> pd.DataFrame:
+        """
+        DataFrame over the newest rows, sharing memory with the buffer
+        """
+        timestamps, values = self.view(limit)
+        index = pd.DatetimeIndex(timestamps.astype('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+
+class MarketDataStore:
+    """
+    One ring buffer per (symbol, timeframe)
+    """
+
+    def __init__(self, capacity: int = 500, dtype: str = 'float64'):
+        self.capacity = capacity
+        self.dtype = dtype
+        self.buffers: Dict[Tuple[str, str], OHLCVRingBuffer] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional['MarketDataStore']:
+        """
+        Enabled by MARKET_BUFFER_CAPACITY (candles); MARKET_DATA_DTYPE=float32 halves price memory
+        """
+        capacity = int(os.getenv('MARKET_BUFFER_CAPACITY', '0') or 0)
+        if capacity <= 0:
+            return None
+        return cls(capacity, os.getenv('MARKET_DATA_DTYPE', 'float64'))
+
+    def buffer(self, symbol: str, timeframe: str) -> OHLCVRingBuffer:
+        key = (symbol, timeframe)
+        if key not in self.buffers:
+            self.buffers[key] = OHLCVRingBuffer(self.capacity, self.dtype)
+        return self.buffers[key]
+
+    def update(self, symbol: str, timeframe: str, rows: List[List[float]]) -> int:
+        return self.buffer(symbol, timeframe).append(rows)
+
+    def replace(self, symbol: str, timeframe: str, rows: List[List[float]]) -> int:
+        return self.buffer(symbol, timeframe).reset(rows)
+
+    def frame(self, symbol: str, timeframe: str, limit: int = None) -> pd.DataFrame:
+        return self.buffer(symbol, timeframe).frame(limit)
+
+    def size(self, symbol: str, timeframe: str) -> int:
+        buffer = self.buffers.get((symbol, timeframe))
+        return buffer.size if buffer else 0
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        buffer = self.buffers.get((symbol, timeframe))
+        return buffer.last_timestamp if buffer else None
+
+    def memory_by_symbol(self) -> Dict[str, int]:
+        """
+        Bytes held per symbol across all its timeframes
+        """
+        usage: Dict[str, int] = {}
+        for (symbol, _), buffer in self.buffers.items():
+            usage[symbol] = usage.get(symbol, 0) + buffer.nbytes
+        return usage
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+if __name__ == '__main__':
+    # Soak test: repeated incremental updates + indicator passes should keep RSS flat
+    import argparse
+
+    from benchmark import generate_ohlcv
+    from indicators import get_backend
+
+    parser = argparse.ArgumentParser(description='Ring buffer memory soak test')
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--dtype', default='float32')
+    args = parser.parse_args()
+
+    history = 100
+    timeframes = ['15m', '1h', '4h']
+    store = MarketDataStore(capacity=history, dtype=args.dtype)
+    backend = get_backend('numpy')
+    candles = {(i, tf): generate_ohlcv(history + args.cycles, tf, seed=i)
+               for i in range(args.symbols) for tf in timeframes}
+
+    for cycle in range(args.cycles):
+        for (i, tf), rows in candles.items():
+            symbol = f"SYM{i:03d}/USDT"
+            store.update(symbol, tf, rows[:history] if cycle == 0 else rows[history + cycle - 1:history + cycle])
+            if tf == '1h':
+                df = store.frame(symbol, tf, history)
+                backend.rsi(df['close'])
+                backend.atr(df['high'], df['low'], df['close'])
+        if cycle % max(1, args.cycles // 10) == 0:
+            per_symbol = store.nbytes / args.symbols / 1024
+            print(f"🔁 cycle {cycle:5d} | RSS {_rss_mb():7.1f} MB | buffers {store.nbytes/1e6:.2f} MB "
+                  f"({per_symbol:.1f} KiB/symbol)")
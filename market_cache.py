@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exchange Market Cache
+Persists ccxt markets/currencies to a local JSON file with a TTL so a
+cold start does not have to call load_markets() over the network.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.getenv('MARKET_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+DEFAULT_TTL = float(os.getenv('MARKET_CACHE_TTL', 6 * 3600))  # seconds
+
+
+class MarketCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path(self, exchange_id: str) -> str:
+        return os.path.join(self.cache_dir, f"markets_{exchange_id}.json")
+
+    def load(self, exchange_id: str) -> Optional[Dict]:
+        """
+        Cached payload if present and younger than the TTL
+        """
+        try:
+            with open(self.path(exchange_id)) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - payload.get('saved_at', 0) > self.ttl:
+            return None
+        return payload
+
+    def save(self, exchange_id: str, markets: Dict, currencies: Dict = None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(exchange_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'saved_at': time.time(), 'markets': markets, 'currencies': currencies},
+                      f, default=str)
+        os.replace(tmp_path, path)
+
+    def apply(self, exchange, refresh: bool = True) -> str:
+        """
+        Load markets into a ccxt exchange from cache, or from the network
+        (and refresh the cache) when it is missing or expired.
+        Returns 'cache', 'network' or 'skipped'.
+        """
+        payload = self.load(exchange.id)
+        if payload:
+            exchange.set_markets(payload['markets'], payload.get('currencies'))
+            return 'cache'
+        if not refresh:
+            return 'skipped'
+        exchange.load_markets()
+        try:
+            self.save(exchange.id, exchange.markets, exchange.currencies)
+        except OSError as e:
+            print(f"⚠️ Could not write market cache: {e}")
+        return 'network'
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alert Dispatcher
+Non-blocking delivery of signals to Telegram and webhooks. The scan loop
+only enqueues; rendering, batching, rate limiting and retries run on a
+background asyncio loop with a pooled aiohttp session.
+"""
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from lazy_imports import lazy_import
+
+aiohttp = lazy_import('aiohttp')
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async rate limiter: `rate` tokens per second, bursts up to `burst`
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class WebhookDestination:
+    """
+    POSTs {"text": ...} JSON to a URL
+    """
+    max_length = 8000
+
+    def __init__(self, url: str, rate: float = 2.0, burst: int = 5, name: str = None):
+        self.url = url
+        self.name = name or 'webhook'
+        self.bucket = TokenBucket(rate, burst)
+
+    def build_request(self, text: str):
+        return self.url, {'text': text}
+
+
+class TelegramDestination:
+    """
+    Telegram Bot API sendMessage
+    """
+    max_length = 4096  # Telegram hard limit per message
+
+    def __init__(self, token: str, chat_id: str, rate: float = 1.0, burst: int = 3,
+                 api_url: str = 'https://api.telegram.org'):
+        self.url = f"{api_url}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.name = 'telegram'
+        self.bucket = TokenBucket(rate, burst)
+
+    def build_request(self, text: str):
+        return self.url, {'chat_id': self.chat_id, 'text': text, 'disable_web_page_preview': True}
+
+
+def batch_messages(texts: List[str], max_length: int, separator: str = '\n') -> List[str]:
+    """
+    Pack rendered alerts into as few messages as fit under max_length
+    """
+    messages, current = [], ''
+    for text in texts:
+        text = text.strip()[:max_length]
+        candidate = f"{current}{separator}{text}" if current else text
+        if len(candidate) <= max_length:
+            current = candidate
+        else:
+            messages.append(current)
+            current = text
+    if current:
+        messages.append(current)
+    return messages
+
+
+class AlertDispatcher:
+    def __init__(self, destinations: List, render: Callable = str, queue_size: int = 1000,
+                 batch_window: float = 1.0, max_retries: int = 4, backoff: float = 0.5,
+                 pool_size: int = 10, timeout: float = 10.0):
+        """
+        destinations: Telegram/Webhook destinations
+        render: signal -> text, called on the dispatcher thread
+        """
+        self.destinations = destinations
+        self.render = render
+        self.queue_size = queue_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self.metrics = {
+            'submitted': 0,
+            'dropped': 0,
+            'batches': 0,
+            'sent': 0,
+            'failed': 0,
+            'retries': 0,
+            'render_errors': 0,
+        }
+        self.latencies = deque(maxlen=1000)  # seconds from submit to delivery
+
+        # Thread-safe and bounded, so submit() knows at once whether a signal was accepted
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stopping = False
+
+    @classmethod
+    def from_env(cls, render: Callable = str, **kwargs) -> Optional['AlertDispatcher']:
+        """
+        Build from TELEGRAM_TOKEN/TELEGRAM_CHAT_ID and WEBHOOK_URL; None if unset
+        """
+        destinations = []
+        if os.getenv('TELEGRAM_TOKEN') and os.getenv('TELEGRAM_CHAT_ID'):
+            destinations.append(TelegramDestination(os.getenv('TELEGRAM_TOKEN'), os.getenv('TELEGRAM_CHAT_ID')))
+        if os.getenv('WEBHOOK_URL'):
+            destinations.append(WebhookDestination(os.getenv('WEBHOOK_URL')))
+        return cls(destinations, render, **kwargs) if destinations else None
+
+    # Hot path
+
+    def submit(self, signals: List) -> bool:
+        """
+        Enqueue signals without blocking; returns False if the queue is full
+        """
+        if not signals:
+            return True
+        if self._loop is None:
+            self.start()
+        try:
+            self._queue.put_nowait((time.monotonic(), list(signals)))
+        except queue.Full:
+            self.metrics['dropped'] += len(signals)
+            return False
+        self.metrics['submitted'] += len(signals)
+        self._wake()
+        return True
+
+    def _wake(self):
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    # Lifecycle
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Deliver what is queued (up to `timeout`) and shut down
+        """
+        if self._loop is None:
+            return
+        self._stopping = True
+        self._wake()
+        self._thread.join(timeout)
+        self._loop = None
+        self._thread = None
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._consume())
+        finally:
+            self._loop.close()
+
+    async def _next(self, timeout: float = None):
+        """
+        Next queued item, or None on timeout (0 = don't wait) or once stopping and drained
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if self._stopping or (remaining is not None and remaining <= 0):
+                return None
+            self._wakeup.clear()
+            if not self._queue.empty() or self._stopping:
+                continue  # arrived between the check and the clear
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def _consume(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            while True:
+                item = await self._next()
+                if item is None:
+                    break
+                batch = [item]
+                # Coalesce everything that arrives within the batch window (no waiting once stopping)
+                deadline = time.monotonic() + self.batch_window
+                while True:
+                    remaining = 0.0 if self._stopping else max(0.0, deadline - time.monotonic())
+                    nxt = await self._next(remaining)
+                    if nxt is None:
+                        break
+                    batch.append(nxt)
+                await self._deliver(session, batch)
+
+    # Delivery
+
+    def _render(self, batch) -> List[str]:
+        texts = []
+        for _, signals in batch:
+            for signal in signals:
+                try:
+                    texts.append(self.render(signal))
+                except Exception as e:
+                    self.metrics['render_errors'] += 1
+                    print(f"❌ Alert render error: {e}")
+        return texts
+
+    async def _deliver(self, session, batch):
+        self.metrics['batches'] += 1
+        texts = self._render(batch)
+        if not texts:
+            return
+        oldest = min(submitted for submitted, _ in batch)
+        await asyncio.gather(*[
+            self._send_all(session, destination, batch_messages(texts, destination.max_length), oldest)
+            for destination in self.destinations
+        ])
+
+    async def _send_all(self, session, destination, messages: List[str], submitted: float):
+        for message in messages:
+            if await self._send(session, destination, message):
+                self.metrics['sent'] += 1
+                self.latencies.append(time.monotonic() - submitted)
+            else:
+                self.metrics['failed'] += 1
+
+    async def _send(self, session, destination, text: str) -> bool:
+        url, payload = destination.build_request(text)
+        for attempt in range(self.max_retries + 1):
+            await destination.bucket.acquire()
+            retry_after = None
+            try:
+                async with session.post(url, json=payload) as response:
+                    if response.status < 300:
+                        return True
+                    if response.status not in RETRY_STATUSES:
+                        print(f"❌ {destination.name} rejected alert: HTTP {response.status}")
+                        return False
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"⚠️ {destination.name} delivery error: {e}")
+
+            if attempt == self.max_retries:
+                break
+            self.metrics['retries'] += 1
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.2)
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+        return False
+
+    def stats(self) -> Dict:
+        """
+        Counters plus delivery latency percentiles (seconds)
+        """
+        stats = dict(self.metrics)
+        samples = sorted(self.latencies)
+        if samples:
+            stats['latency_p50'] = samples[len(samples) // 2]
+            stats['latency_p95'] = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+            stats['latency_max'] = samples[-1]
+        stats['queued'] = self._queue.qsize()
+        return stats
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resilient Calls
+Per-endpoint circuit breakers, hard timeouts and hedged retries for
+blocking exchange/API calls.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Tuple
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling the endpoint while its breaker is open
+    """
+
+
+def network_errors() -> Tuple[type, ...]:
+    """
+    Transient error types: OS-level network errors (TimeoutError, ConnectionError,
+    requests' exceptions) and, once ccxt is loaded, ccxt.NetworkError
+    """
+    ccxt = sys.modules.get('ccxt')
+    return (OSError, ccxt.NetworkError) if ccxt is not None else (OSError,)
+
+
+class CircuitBreaker:
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out; after reset_timeout one trial call is let through
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"🔌 Circuit '{self.name}' opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the next trial call is allowed (0 when closed)
+        """
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class ResilientCaller:
+    def __init__(self, timeout: float = 10.0, hedge_after: float = 2.0, max_workers: int = 16,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 retry_on: Tuple[type, ...] = None):
+        """
+        timeout: hard limit per call (seconds), including the hedge
+        hedge_after: start a second attempt if the first has not answered by then
+        retry_on: exception types worth hedging and counting against the breaker
+                  (default: network_errors()); anything else is re-raised at once
+        """
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_on = retry_on
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = {'calls': 0, 'hedged': 0, 'timeouts': 0, 'failures': 0, 'rejected': 0,
+                        'errors': 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='resilient')
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+        return self.breakers[endpoint]
+
+    def call(self, endpoint: str, fn: Callable, *args, **kwargs):
+        """
+        Run fn through the endpoint's breaker. A second attempt is started when
+        the first is slow (hedge) or fails early with a retryable error; the
+        first success wins. Non-retryable errors (bad symbol, auth, ...) mean
+        the endpoint answered: they are raised without a hedge or a breaker failure.
+        """
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            self.metrics['rejected'] += 1
+            raise CircuitOpenError(f"circuit '{endpoint}' open, retry in {breaker.retry_in():.0f}s")
+
+        self.metrics['calls'] += 1
+        deadline = time.monotonic() + self.timeout
+        pending = {self._executor.submit(fn, *args, **kwargs)}
+        attempts = 1
+        error = None
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = min(remaining, self.hedge_after) if attempts == 1 else remaining
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    breaker.record_success()
+                    return future.result()
+                error = future.exception()
+                if not isinstance(error, self.retry_on or network_errors()):
+                    breaker.record_success()
+                    self.metrics['errors'] += 1
+                    raise error
+
+            if attempts == 1 and time.monotonic() < deadline:
+                # First attempt is slow or already failed: hedge with a second one
+                attempts += 1
+                self.metrics['hedged'] += 1
+                pending.add(self._executor.submit(fn, *args, **kwargs))
+
+        breaker.record_failure()
+        if pending:
+            self.metrics['timeouts'] += 1
+            raise TimeoutError(f"{endpoint} timed out after {self.timeout:.1f}s")
+        self.metrics['failures'] += 1
+        raise error
+
+    def status(self) -> Dict:
+        return {
+            'metrics': dict(self.metrics),
+            'breakers': {name: {'state': b.state, 'failures': b.failures, 'retry_in': round(b.retry_in(), 1)}
+                         for name, b in self.breakers.items()},
+        }
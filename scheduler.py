@@ -1,13 +1,159 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from signals import analyze
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-async def job():
-    print("🔍 Running analysis...")
-    signals = await analyze()
-    for symbol, sig in signals:
-        print(f"[{symbol}] → {sig}")
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+
+
+def next_candle_close(now: float, period: float) -> float:
+    """
+    Next epoch-aligned candle close strictly after `now`
+    """
+    return (int(now // period) + 1) * period
+
+
+class ScanScheduler:
+    """
+    Candle-aligned scan cycles with overlap protection and a per-cycle deadline
+    """
+
+    def __init__(self, bot=None, period_seconds: float = 300, settle_seconds: float = 5,
+                 deadline_margin: float = None):
+        """
+        bot: CryptoSignalBot (created on first run if None)
+        settle_seconds: wait after the candle close so the exchange has the final candle
+        deadline_margin: stop scanning this long before the next run is due
+        """
+        self._bot = bot
+        self.period = period_seconds
+        self.settle = settle_seconds
+        self.margin = deadline_margin if deadline_margin is not None else min(30.0, period_seconds * 0.1)
+        self._lock = threading.Lock()
+        self.job_scheduler = None  # APScheduler instance when started by start_scheduler()
+        self.stats = {
+            'runs': 0,
+            'skipped_overlaps': 0,
+            'deadline_misses': 0,
+            'carried_over': 0,
+            'last_lag': None,
+            'max_lag': 0.0,
+            'last_duration': None,
+        }
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            from bot_loader import create_bot
+            self._bot = create_bot()
+        return self._bot
+
+    def deadline_for(self, started: float) -> float:
+        return next_candle_close(started, self.period) + self.settle - self.margin
+
+    def run_cycle(self, scheduled_at: float = None) -> Optional[List]:
+        """
+        Run one scan unless the previous one is still going
+        """
+        if not self._lock.acquire(blocking=False):
+            self.stats['skipped_overlaps'] += 1
+            print("⏭️ Previous scan still running, skipping this run")
+            return None
+        try:
+            started = time.time()
+            lag = max(0.0, started - (scheduled_at if scheduled_at is not None else started))
+            deadline = self.deadline_for(started)
+
+            signals = self.bot.run_scan_cycle(deadline)
+
+            finished = time.time()
+            carried = len(self.bot.carry_over)
+            missed = carried > 0 or finished > deadline
+            self.stats['runs'] += 1
+            self.stats['deadline_misses'] += int(missed)
+            self.stats['carried_over'] = carried
+            self.stats['last_lag'] = round(lag, 3)
+            self.stats['max_lag'] = round(max(self.stats['max_lag'], lag), 3)
+            self.stats['last_duration'] = round(finished - started, 3)
+
+            warning = " | ⚠️ DEADLINE MISSED" if missed else ""
+            print(f"⏱️ Cycle took {finished - started:.1f}s | start lag {lag:.1f}s | "
+                  f"carried over {carried}{warning}")
+            return signals
+        finally:
+            self._lock.release()
+
+    def run_forever(self):
+        """
+        Blocking loop: run now, then at every candle close
+        """
+        scheduled = time.time()
+        while True:
+            try:
+                self.run_cycle(scheduled)
+            except Exception as e:
+                print(f"❌ Scan error: {e}")
+            scheduled = next_candle_close(time.time(), self.period) + self.settle
+            print(f"⏰ Next scan at {datetime.fromtimestamp(scheduled).strftime('%H:%M:%S')}")
+            time.sleep(max(0.0, scheduled - time.time()))
+
+    async def job(self):
+        """
+        APScheduler entry point; the scan runs in a worker thread
+        """
+        scheduled = int(time.time() // self.period) * self.period + self.settle
+        print("🔍 Running analysis...")
+        await asyncio.to_thread(self.run_cycle, scheduled)
+
+    def stop(self):
+        """
+        Stop scheduling runs and flush pending alerts
+        """
+        if self.job_scheduler is not None:
+            self.job_scheduler.shutdown(wait=False)
+            self.job_scheduler = None
+        notifier = getattr(self._bot, 'notifier', None)
+        if notifier is not None:
+            notifier.stop()
+            print(f"📨 Alerts: {notifier.stats()}")
+
+    def report(self) -> Dict:
+        report = dict(self.stats)
+        if self._bot is not None:
+            report['exchange'] = self._bot.fetch_caller.status()
+            if self._bot.sentiment is not None:
+                report['sentiment'] = self._bot.sentiment.report()
+        return report
+
+
+def start_scheduler(timeframe: str = None) -> ScanScheduler:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    timeframe = timeframe or os.getenv('SCAN_TIMEFRAME', '5m')
+    scan = ScanScheduler(period_seconds=TIMEFRAME_SECONDS[timeframe])
+    first_run = next_candle_close(time.time(), scan.period) + scan.settle
 
-def start_scheduler():
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(job, 'interval', minutes=5)
+    # Overlaps are detected (and counted) by ScanScheduler's lock, so allow a
+    # second instance to reach it instead of APScheduler dropping it silently
+    scheduler.add_job(
+        scan.job,
+        IntervalTrigger(seconds=scan.period, start_date=datetime.fromtimestamp(first_run, tz=timezone.utc)),
+        max_instances=2,
+        coalesce=True,
+        misfire_grace_time=int(scan.period),
+    )
     scheduler.start()
+    scan.job_scheduler = scheduler
+    return scan
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sharded Scanning
+Splits the pair universe across worker processes/nodes with consistent
+hashing over live workers, SQLite leases for exclusive symbol ownership,
+and a shared results table merged into one ranked signal list.
+
+    python sharding.py worker --db shards.db --worker-id w1 --fake
+    python sharding.py worker --db shards.db --worker-id w2 --fake
+    python sharding.py merge --db shards.db
+"""
+
+import argparse
+import bisect
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from signal_records import SignalRecord
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes
+    """
+
+    def __init__(self, workers: Iterable[str] = (), vnodes: int = 64):
+        self.vnodes = vnodes
+        self._keys: List[int] = []
+        self._owners: List[str] = []
+        for worker in workers:
+            self.add(worker)
+
+    def add(self, worker: str):
+        for i in range(self.vnodes):
+            key = _hash(f"{worker}#{i}")
+            index = bisect.bisect(self._keys, key)
+            self._keys.insert(index, key)
+            self._owners.insert(index, worker)
+
+    def remove(self, worker: str):
+        keep = [(k, w) for k, w in zip(self._keys, self._owners) if w != worker]
+        self._keys = [k for k, _ in keep]
+        self._owners = [w for _, w in keep]
+
+    def owner(self, symbol: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(symbol)) % len(self._keys)
+        return self._owners[index]
+
+    def assign(self, symbols: Iterable[str]) -> Dict[str, List[str]]:
+        assignment: Dict[str, List[str]] = {}
+        for symbol in symbols:
+            assignment.setdefault(self.owner(symbol), []).append(symbol)
+        return assignment
+
+
+class ShardStore:
+    """
+    Shared SQLite state: worker heartbeats, symbol leases, active signals
+    and per-cycle shard results
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS workers (
+        worker_id TEXT PRIMARY KEY,
+        heartbeat REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS leases (
+        symbol TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS active_signals (
+        symbol TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS results (
+        cycle INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        worker_id TEXT NOT NULL,
+        strength REAL NOT NULL,
+        payload TEXT NOT NULL,
+        created REAL NOT NULL,
+        PRIMARY KEY (cycle, symbol)
+    );
+    CREATE TABLE IF NOT EXISTS publications (
+        worker_id TEXT NOT NULL,
+        cycle INTEGER NOT NULL,
+        published REAL NOT NULL,
+        PRIMARY KEY (worker_id, cycle)
+    );
+    """
+
+    def __init__(self, path: str = 'shards.db', timeout: float = 30.0):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # Membership
+
+    def heartbeat(self, worker_id: str, now: float = None):
+        now = time.time() if now is None else now
+        self.conn.execute(
+            'INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) '
+            'ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat',
+            (worker_id, now))
+
+    def live_workers(self, ttl: float, now: float = None) -> List[str]:
+        now = time.time() if now is None else now
+        rows = self.conn.execute('SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id',
+                                 (now - ttl,))
+        return [row[0] for row in rows]
+
+    def leave(self, worker_id: str):
+        self.conn.execute('DELETE FROM workers WHERE worker_id = ?', (worker_id,))
+        self.conn.execute('DELETE FROM leases WHERE owner = ?', (worker_id,))
+
+    # Leases
+
+    def acquire(self, symbol: str, worker_id: str, ttl: float, now: float = None) -> bool:
+        """
+        Take or renew the lease on a symbol; fails while another worker holds it
+        """
+        now = time.time() if now is None else now
+        self.conn.execute(
+            'INSERT INTO leases (symbol, owner, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(symbol) DO UPDATE SET owner = excluded.owner, expires = excluded.expires '
+            'WHERE leases.owner = excluded.owner OR leases.expires < ?',
+            (symbol, worker_id, now + ttl, now))
+        row = self.conn.execute('SELECT owner FROM leases WHERE symbol = ?', (symbol,)).fetchone()
+        return row is not None and row[0] == worker_id
+
+    def release(self, symbol: str, worker_id: str):
+        self.conn.execute('DELETE FROM leases WHERE symbol = ? AND owner = ?', (symbol, worker_id))
+
+    def lease_owners(self, now: float = None) -> Dict[str, str]:
+        now = time.time() if now is None else now
+        rows = self.conn.execute('SELECT symbol, owner FROM leases WHERE expires >= ?', (now,))
+        return dict(rows.fetchall())
+
+    # Active signals (handed over between owners)
+
+    def save_active_signal(self, record: SignalRecord):
+        self.conn.execute(
+            'INSERT INTO active_signals (symbol, payload, updated) VALUES (?, ?, ?) '
+            'ON CONFLICT(symbol) DO UPDATE SET payload = excluded.payload, updated = excluded.updated',
+            (record.symbol, record.to_json(), time.time()))
+
+    def load_active_signal(self, symbol: str) -> Optional[SignalRecord]:
+        row = self.conn.execute('SELECT payload FROM active_signals WHERE symbol = ?', (symbol,)).fetchone()
+        return SignalRecord.from_json(row[0]) if row else None
+
+    def delete_active_signal(self, symbol: str):
+        self.conn.execute('DELETE FROM active_signals WHERE symbol = ?', (symbol,))
+
+    # Results
+
+    def publish_results(self, cycle: int, worker_id: str, records: List[SignalRecord]):
+        """
+        Store a shard's signals for a cycle; the publication is recorded even with no signals
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM results WHERE cycle = ? AND worker_id = ?', (cycle, worker_id))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO results (cycle, symbol, worker_id, strength, payload, created) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(cycle, r.symbol, worker_id, r.signal_strength, r.to_json(), now) for r in records])
+            self.conn.execute(
+                'INSERT OR REPLACE INTO publications (worker_id, cycle, published) VALUES (?, ?, ?)',
+                (worker_id, cycle, now))
+
+    def latest_cycle(self) -> Optional[int]:
+        return self.conn.execute('SELECT MAX(cycle) FROM results').fetchone()[0]
+
+    def merged_results(self, cycle: int = None, now: float = None) -> List[SignalRecord]:
+        """
+        One ranked list, strongest first. By default each worker's latest
+        published cycle is used, so shards that finish at different times
+        are all included, and a row only counts while its worker still
+        holds the symbol's lease (workers that left, died or handed the
+        symbol off drop out); pass `cycle` to read a single cycle.
+        """
+        if cycle is not None:
+            rows = self.conn.execute('SELECT payload FROM results WHERE cycle = ? '
+                                     'ORDER BY strength DESC, symbol', (cycle,))
+            return [SignalRecord.from_json(row[0]) for row in rows]
+
+        now = time.time() if now is None else now
+        rows = self.conn.execute(
+            'SELECT r.symbol, r.payload FROM results r '
+            'JOIN (SELECT worker_id, MAX(cycle) AS cycle FROM publications GROUP BY worker_id) p '
+            'ON r.worker_id = p.worker_id AND r.cycle = p.cycle '
+            'JOIN leases l ON l.symbol = r.symbol AND l.owner = r.worker_id AND l.expires >= ? '
+            'ORDER BY r.cycle DESC', (now,))
+        latest: Dict[str, SignalRecord] = {}
+        for symbol, payload in rows:
+            if symbol not in latest:
+                latest[symbol] = SignalRecord.from_json(payload)
+        return sorted(latest.values(), key=lambda r: (-r.signal_strength, r.symbol))
+
+    def prune_results(self, keep_cycles: int = 10):
+        for table in ('results', 'publications'):
+            latest = self.conn.execute(f'SELECT MAX(cycle) FROM {table}').fetchone()[0]
+            if latest is not None:
+                self.conn.execute(f'DELETE FROM {table} WHERE cycle <= ?', (latest - keep_cycles,))
+
+
+class ShardWorker:
+    """
+    Runs a CryptoSignalBot on the slice of the universe this worker owns
+    """
+
+    def __init__(self, bot, store: ShardStore, worker_id: str = None,
+                 universe: List[str] = None, interval_minutes: float = 30,
+                 lease_ttl: float = None, heartbeat_ttl: float = None):
+        self.bot = bot
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.universe = list(universe or bot.trading_pairs)
+        # trading_pairs shrinks to the owned slice; sentiment z-scores still use everything
+        bot.sentiment_universe = self.universe
+        self.interval = interval_minutes * 60
+        # A lease must outlive one full cycle, otherwise it lapses mid-scan
+        self.lease_ttl = lease_ttl or 3 * self.interval
+        self.heartbeat_ttl = heartbeat_ttl or 3 * self.interval
+        self.owned: List[str] = []
+        # Register right away so peers count this worker at their next rebalance
+        self.store.heartbeat(self.worker_id)
+
+    def cycle_id(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        return int(now // self.interval)
+
+    def rebalance(self) -> List[str]:
+        """
+        Refresh membership, hand off symbols that moved away and lease the rest
+        """
+        self.store.heartbeat(self.worker_id)
+        ring = HashRing(self.store.live_workers(self.heartbeat_ttl))
+        desired = [s for s in self.universe if ring.owner(s) == self.worker_id]
+
+        for symbol in [s for s in self.owned if s not in desired]:
+            self._hand_off(symbol)
+
+        owned = []
+        for symbol in desired:
+            if not self.store.acquire(symbol, self.worker_id, self.lease_ttl):
+                continue  # another worker holds the lease (handover pending or ours expired)
+            if symbol not in self.owned:
+                record = self.store.load_active_signal(symbol)
+                if record is not None:
+                    self.bot.active_signals[symbol] = record
+            owned.append(symbol)
+
+        # Only the lease holder tracks a signal
+        for symbol in [s for s in self.bot.active_signals if s not in owned]:
+            del self.bot.active_signals[symbol]
+
+        if owned != self.owned:
+            print(f"🔀 {self.worker_id}: owns {len(owned)}/{len(self.universe)} symbols")
+        self.owned = owned
+        self.bot.trading_pairs = list(owned)
+        return owned
+
+    def _hand_off(self, symbol: str):
+        record = self.bot.active_signals.pop(symbol, None)
+        if record is not None:
+            self.store.save_active_signal(record)
+        self.store.release(symbol, self.worker_id)
+
+    def _persist_active_signals(self):
+        for symbol in self.owned:
+            record = self.bot.active_signals.get(symbol)
+            if record is None:
+                self.store.delete_active_signal(symbol)
+            else:
+                self.store.save_active_signal(record)
+
+    def run_cycle(self) -> List[SignalRecord]:
+        """
+        One scan over owned symbols; results are published for merging
+        """
+        cycle = self.cycle_id()
+        self.rebalance()
+        self.bot.update_active_signals()
+        signals = self.bot.scan_all_pairs() if self.owned else []
+        self._persist_active_signals()
+        self.store.publish_results(cycle, self.worker_id, signals)
+        self.store.prune_results()
+        return signals
+
+    def stop(self):
+        """
+        Leave the cluster, handing every owned symbol back, and flush pending alerts
+        """
+        for symbol in list(self.owned):
+            self._hand_off(symbol)
+        self.owned = []
+        self.store.leave(self.worker_id)
+        print(f"👋 {self.worker_id} left the cluster")
+        notifier = getattr(self.bot, 'notifier', None)
+        if notifier is not None:
+            notifier.stop()
+
+    def run_forever(self, cycles: int = 0):
+        """
+        Scan every interval until interrupted (or for `cycles` cycles)
+        """
+        print(f"🔄 Worker {self.worker_id} scanning every {self.interval/60:g} minutes...")
+        done = 0
+        try:
+            while True:
+                started = time.time()
+                try:
+                    signals = self.run_cycle()
+                    print(f"📈 {self.worker_id}: {len(signals)} signals from {len(self.owned)} symbols")
+                except Exception as e:
+                    print(f"❌ Shard cycle error: {e}")
+                done += 1
+                if cycles and done >= cycles:
+                    break
+                time.sleep(max(0.0, self.interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            print("\n⏹️ Worker stopped by user!")
+        finally:
+            self.stop()
+
+
+def _make_bot(fake: bool, symbols: int):
+    if fake:
+        from benchmark import FakeExchange, make_bot
+        universe = [f"SYM{i:03d}/USDT" for i in range(symbols)]
+        return make_bot(FakeExchange(universe, ['15m', '1h', '4h'], 100), universe)
+    from bot_loader import create_bot
+    return create_bot()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Sharded CryptoSignalBot workers')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    worker = sub.add_parser('worker', help='run one shard worker')
+    worker.add_argument('--db', default='shards.db')
+    worker.add_argument('--worker-id', default=None)
+    worker.add_argument('--interval', type=float, default=30, help='minutes between scans')
+    worker.add_argument('--fake', action='store_true', help='use the offline fake exchange')
+    worker.add_argument('--symbols', type=int, default=24, help='universe size with --fake')
+    worker.add_argument('--cycles', type=int, default=0, help='stop after N cycles (0 = forever)')
+
+    merge = sub.add_parser('merge', help='print the merged ranked signal list')
+    merge.add_argument('--db', default='shards.db')
+    merge.add_argument('--cycle', type=int, default=None)
+
+    args = parser.parse_args(argv)
+    store = ShardStore(args.db)
+
+    if args.command == 'merge':
+        signals = store.merged_results(args.cycle)
+        print(f"🏁 {len(signals)} signals across shards")
+        if not signals and args.cycle is None:
+            print("ℹ️ Only symbols leased by running workers are merged; use --cycle to read a past cycle")
+        for record in signals:
+            print(f"• {record.symbol} {record.signal_type.value} strength {record.signal_strength:.2f}")
+        return
+
+    shard = ShardWorker(_make_bot(args.fake, args.symbols), store, args.worker_id,
+                        interval_minutes=args.interval)
+    shard.run_forever(args.cycles)
+
+
+if __name__ == '__main__':
+    main()
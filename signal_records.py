@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact Signal Records
+Slotted, typed replacements for the nested signal/status dicts
+"""
+
+import json
+import sys
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class SignalType(str, Enum):
+    LONG = 'LONG'
+    SHORT = 'SHORT'
+
+
+class SignalStatus(str, Enum):
+    WAITING_ENTRY = 'WAITING_ENTRY'
+    IN_PROFIT = 'IN_PROFIT'
+    TP1_HIT = 'TP1_HIT'
+    TP2_HIT = 'TP2_HIT'
+    TP3_HIT = 'TP3_HIT'
+    STOPPED_OUT = 'STOPPED_OUT'
+    ERROR = 'ERROR'
+
+
+# Statuses after which a signal is no longer tracked
+CLOSED_STATUSES = (SignalStatus.STOPPED_OUT, SignalStatus.TP3_HIT)
+
+
+def _opt_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _parse_timestamp(value) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.strptime(str(value), TIMESTAMP_FORMAT).timestamp()
+
+
+@dataclass(slots=True)
+class StatusRecord:
+    """
+    Status of an active signal at the last check
+    """
+    status: SignalStatus
+    current_price: Optional[float] = None
+    pnl_percent: Optional[float] = None
+    distance_to_entry: Optional[float] = None
+    message: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """
+        Legacy status dict (only the keys that are set)
+        """
+        data = {'status': self.status.value}
+        for name in ('current_price', 'pnl_percent', 'distance_to_entry', 'message'):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StatusRecord':
+        return cls(
+            status=SignalStatus(data['status']),
+            current_price=_opt_float(data.get('current_price')),
+            pnl_percent=_opt_float(data.get('pnl_percent')),
+            distance_to_entry=_opt_float(data.get('distance_to_entry')),
+            message=data.get('message'),
+        )
+
+    def to_row(self) -> List:
+        return [self.status.value, self.current_price, self.pnl_percent,
+                self.distance_to_entry, self.message]
+
+    @classmethod
+    def from_row(cls, row: List) -> 'StatusRecord':
+        return cls(SignalStatus(row[0]), *row[1:])
+
+
+@dataclass(slots=True)
+class SignalRecord:
+    """
+    Flat signal record: scalars only, no DataFrames or Timestamps
+    """
+    symbol: str
+    signal_type: SignalType
+    signal_strength: float
+    timestamp: float
+    current_price: float
+    conditions_met: Tuple[str, ...]
+    trend_1h: str
+    strength_1h: float
+    confidence_1h: float
+    trend_4h: str
+    strength_4h: float
+    confidence_4h: float
+    sentiment: str
+    sentiment_score: float
+    fear_greed_index: Optional[int]
+    volume_trend: bool
+    recent_spike: bool
+    mfi: float
+    entry_price: float
+    stop_loss: float
+    take_profit_1: float
+    take_profit_2: float
+    take_profit_3: float
+    risk_reward_ratio: float
+    order_block_count: int
+    divergence_count: int
+    current_status: Optional[StatusRecord] = None
+    # Appended with defaults so rows stored before they existed still load
+    funding_rate: Optional[float] = None
+    funding_z: Optional[float] = None
+    oi_change: Optional[float] = None
+    oi_z: Optional[float] = None
+
+    @property
+    def timestamp_str(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).strftime(TIMESTAMP_FORMAT)
+
+    @classmethod
+    def from_analysis(cls, symbol: str, analysis: Dict, entry_exit: Dict,
+                      current_price: float, timestamp: float = None) -> 'SignalRecord':
+        """
+        Build a record from `enhanced_signal_scoring` output and entry/exit levels
+        """
+        structure_1h = analysis['structure_1h']
+        structure_4h = analysis['structure_4h']
+        sentiment = analysis['sentiment']
+        volume = analysis['volume_analysis']
+        return cls(
+            symbol=sys.intern(symbol),
+            signal_type=SignalType(analysis['signal_type']),
+            signal_strength=round(float(analysis['score']), 2),
+            timestamp=time.time() if timestamp is None else float(timestamp),
+            current_price=float(current_price),
+            conditions_met=tuple(sys.intern(k) for k, v in analysis['conditions_met'].items() if v),
+            trend_1h=sys.intern(structure_1h['trend']),
+            strength_1h=float(structure_1h['strength']),
+            confidence_1h=float(structure_1h['confidence']),
+            trend_4h=sys.intern(structure_4h['trend']),
+            strength_4h=float(structure_4h['strength']),
+            confidence_4h=float(structure_4h['confidence']),
+            sentiment=sys.intern(sentiment['sentiment']),
+            sentiment_score=float(sentiment['score']),
+            fear_greed_index=sentiment.get('fear_greed_index'),
+            funding_rate=sentiment.get('funding_rate'),
+            funding_z=sentiment.get('funding_z'),
+            oi_change=sentiment.get('oi_change'),
+            oi_z=sentiment.get('oi_z'),
+            volume_trend=bool(volume['volume_trend']),
+            recent_spike=bool(volume['recent_spike']),
+            mfi=float(volume['mfi']),
+            entry_price=float(entry_exit['entry_price']),
+            stop_loss=float(entry_exit['stop_loss']),
+            take_profit_1=float(entry_exit['take_profit_1']),
+            take_profit_2=float(entry_exit['take_profit_2']),
+            take_profit_3=float(entry_exit['take_profit_3']),
+            risk_reward_ratio=float(entry_exit['risk_reward_ratio']),
+            order_block_count=len(analysis['order_blocks']),
+            divergence_count=len(analysis['divergences']),
+        )
+
+    @classmethod
+    def from_signal(cls, signal: Dict) -> 'SignalRecord':
+        """
+        Adapter for legacy nested signal dicts
+        """
+        analysis = {
+            'signal_type': signal['signal_type'],
+            'score': signal['signal_strength'],
+            'conditions_met': signal['conditions_met'],
+            'structure_1h': signal['market_structure_1h'],
+            'structure_4h': signal['market_structure_4h'],
+            'sentiment': signal['sentiment'],
+            'volume_analysis': signal['volume_analysis'],
+            'order_blocks': signal.get('order_blocks', []),
+            'divergences': signal.get('divergences', []),
+        }
+        record = cls.from_analysis(signal['symbol'], analysis, signal['entry_exit_points'],
+                                   signal['current_price'], _parse_timestamp(signal.get('timestamp')))
+        if signal.get('current_status'):
+            record.current_status = StatusRecord.from_dict(signal['current_status'])
+        return record
+
+    @property
+    def entry_exit_points(self) -> Dict:
+        return {
+            'entry_price': self.entry_price,
+            'stop_loss': self.stop_loss,
+            'take_profit_1': self.take_profit_1,
+            'take_profit_2': self.take_profit_2,
+            'take_profit_3': self.take_profit_3,
+            'risk_reward_ratio': self.risk_reward_ratio,
+        }
+
+    def to_dict(self) -> Dict:
+        """
+        Flat JSON-friendly dict (used for exports)
+        """
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data['signal_type'] = self.signal_type.value
+        data['timestamp'] = self.timestamp_str
+        data['conditions_met'] = list(self.conditions_met)
+        data['current_status'] = self.current_status.to_dict() if self.current_status else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SignalRecord':
+        values = dict(data)
+        values['signal_type'] = SignalType(values['signal_type'])
+        values['timestamp'] = _parse_timestamp(values.get('timestamp'))
+        values['conditions_met'] = tuple(values['conditions_met'])
+        status = values.get('current_status')
+        values['current_status'] = StatusRecord.from_dict(status) if status else None
+        return cls(**values)
+
+    def to_row(self) -> List:
+        """
+        Positional row in field order (store / compact JSON)
+        """
+        row = [getattr(self, f.name) for f in fields(self)]
+        row[1] = self.signal_type.value
+        row[5] = list(self.conditions_met)
+        row[_STATUS_INDEX] = self.current_status.to_row() if self.current_status else None
+        return row
+
+    @classmethod
+    def from_row(cls, row: List) -> 'SignalRecord':
+        values = list(row)
+        # Rows written before trailing fields were added are shorter: those take their defaults
+        values += [None] * (len(SIGNAL_COLUMNS) - len(values))
+        values[0] = sys.intern(values[0])
+        values[1] = SignalType(values[1])
+        values[5] = tuple(sys.intern(k) for k in values[5])
+        status = values[_STATUS_INDEX]
+        values[_STATUS_INDEX] = StatusRecord.from_row(status) if status else None
+        return cls(*values)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_row(), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'SignalRecord':
+        return cls.from_row(json.loads(payload))
+
+
+SIGNAL_COLUMNS = tuple(f.name for f in fields(SignalRecord))
+_STATUS_INDEX = SIGNAL_COLUMNS.index('current_status')
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# The bot's modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signal_records import SignalRecord
+
+
+@pytest.fixture
+def make_record():
+    """
+    Factory for minimal SignalRecords
+    """
+    def factory(symbol: str = 'BTC/USDT', strength: float = 0.7, signal_type: str = 'LONG') -> SignalRecord:
+        structure = {'trend': 'BULLISH', 'strength': 1.0, 'confidence': 0.8}
+        analysis = {
+            'signal_type': signal_type,
+            'score': strength,
+            'conditions_met': {'structure_bullish_1h': True},
+            'structure_1h': structure,
+            'structure_4h': structure,
+            'sentiment': {'sentiment': 'NEUTRAL', 'score': 50},
+            'volume_analysis': {'volume_trend': True, 'recent_spike': False, 'mfi': 55.0},
+            'order_blocks': [],
+            'divergences': [],
+        }
+        levels = {'entry_price': 100.0, 'stop_loss': 95.0, 'take_profit_1': 105.0,
+                  'take_profit_2': 110.0, 'take_profit_3': 115.0, 'risk_reward_ratio': 2.0}
+        return SignalRecord.from_analysis(symbol, analysis, levels, 100.0, timestamp=1_700_000_000)
+    return factory
@@ -0,0 +1,48 @@
+import pytest
+
+from benchmark import check_meta, compare
+
+
+def report(symbols=12, history=100, repeat=5, backend='ta', scan=1.2, method=0.01):
+    return {
+        'meta': {'symbols': symbols, 'history': history, 'repeat': repeat, 'backend': backend},
+        'results': {
+            'calculate_technical_indicators': {'median': method},
+            'scan_all_pairs': {'median': scan, 'per_symbol': scan / symbols},
+        },
+    }
+
+
+def test_same_meta_compares_medians():
+    rows = compare(report(scan=1.5), report(scan=1.2), threshold=0.2)
+    scan = next(row for row in rows if row['name'] == 'scan_all_pairs')
+    assert scan['ratio'] == pytest.approx(1.25)
+    assert scan['regression']
+
+
+@pytest.mark.parametrize('field, value', [('history', 500), ('backend', 'numpy')])
+def test_incomparable_meta_is_refused(field, value):
+    with pytest.raises(ValueError, match=field):
+        compare(report(**{field: value}), report())
+
+
+def test_different_symbol_count_compares_scan_per_symbol():
+    # Twice the symbols at the same per-symbol cost: not a regression
+    current, baseline = report(symbols=24, scan=2.4), report(symbols=12, scan=1.2)
+    assert check_meta(current, baseline) == [
+        'symbols 12 -> 24: scan_all_pairs compared per symbol']
+
+    rows = {row['name']: row for row in compare(current, baseline)}
+    assert rows['scan_all_pairs (per symbol)']['ratio'] == pytest.approx(1.0)
+    assert not any(row['regression'] for row in rows.values())
+
+
+def test_different_repeat_only_warns():
+    warnings = check_meta(report(repeat=2), report(repeat=5))
+    assert len(warnings) == 1 and warnings[0].startswith('repeat 5 -> 2')
+
+
+def test_baseline_without_meta_is_accepted():
+    baseline = report()
+    del baseline['meta']
+    assert compare(report(), baseline)
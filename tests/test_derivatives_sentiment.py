@@ -0,0 +1,103 @@
+import threading
+import time
+
+from derivatives_sentiment import (DerivativesSentiment, IncompleteRefresh,
+                                   StaticDerivativesSource, robust_zscores)
+
+UNIVERSE = [f"SYM{i:03d}/USDT" for i in range(8)]
+
+
+class InterruptedSource(StaticDerivativesSource):
+    """
+    Open interest refresh that stops after `limit` symbols once
+    """
+
+    def __init__(self, *args, limit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limit = limit
+        self.oi_requests = []
+
+    def open_interest(self, symbols):
+        self.oi_requests.append(list(symbols))
+        values = super().open_interest(symbols)
+        if self.limit is None:
+            return values
+        limit, self.limit = self.limit, None
+        done = symbols[:limit]
+        raise IncompleteRefresh('breaker open', {s: values[s] for s in done}, symbols[limit:])
+
+
+class SlowSource(StaticDerivativesSource):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def funding_rates(self, symbols):
+        self.release.wait(5)
+        return super().funding_rates(symbols)
+
+
+def test_robust_zscores():
+    scores = robust_zscores({'a': 1.0, 'b': 2.0, 'c': 3.0, 'd': 100.0})
+    assert scores['b'] < 0 < scores['c'] < scores['d']
+    assert robust_zscores({'a': 1.0, 'b': 1.0, 'c': 1.0}) == {'a': 0.0, 'b': 0.0, 'c': 0.0}
+
+
+def test_snapshot_is_per_symbol():
+    funding = {s: 0.0001 * i for i, s in enumerate(UNIVERSE)}
+    provider = DerivativesSentiment(StaticDerivativesSource(funding, {s: 1e6 for s in UNIVERSE}))
+    provider.refresh(UNIVERSE)
+
+    lowest, highest = provider.get(UNIVERSE[0]), provider.get(UNIVERSE[-1])
+    assert lowest['score'] > 50 > highest['score']  # crowded shorts read bullish, crowded longs bearish
+    assert highest['funding_z'] > 0
+    assert provider.get('UNKNOWN/USDT') == {'sentiment': 'NEUTRAL', 'score': 50}
+
+
+def test_stale_snapshot_reads_neutral():
+    provider = DerivativesSentiment(StaticDerivativesSource.synthetic(UNIVERSE), funding_interval=10)
+    provider.refresh(UNIVERSE, now=1000.0)
+    assert 'funding_z' in provider.get(UNIVERSE[0], now=1010.0)
+    assert provider.get(UNIVERSE[0], now=1031.0) == {'sentiment': 'NEUTRAL', 'score': 50}
+
+
+def test_interrupted_open_interest_refresh_keeps_baselines():
+    source = InterruptedSource({s: 0.0001 for s in UNIVERSE}, {s: 1e6 for s in UNIVERSE})
+    provider = DerivativesSentiment(source, oi_interval=100)
+    provider.refresh(UNIVERSE, now=0.0)
+    baseline_time = provider.oi_updated
+
+    for symbol in UNIVERSE:
+        source.oi[symbol] = 1.1e6
+    source.limit = 3
+    provider.refresh_if_due(UNIVERSE, now=200.0)
+
+    # Partial results merged, skipped symbols keep their baseline, interval not advanced
+    assert provider.oi_updated == baseline_time
+    assert provider.oi_pending == UNIVERSE[3:]
+    assert set(provider.oi_change) == set(UNIVERSE[:3])
+    assert all(provider.open_interest[s] == 1e6 for s in UNIVERSE[3:])
+
+    # Next pass fetches only the missing symbols and completes the interval
+    assert provider.due(now=201.0)['open_interest']
+    provider.refresh_if_due(UNIVERSE, now=201.0)
+    assert source.oi_requests[-1] == UNIVERSE[3:]
+    assert provider.oi_pending == []
+    assert provider.oi_updated == 201.0
+    assert all(abs(provider.oi_change[s] - 0.1) < 1e-9 for s in UNIVERSE)
+
+
+def test_background_refresh_does_not_block_readers():
+    source = SlowSource({s: 0.0001 for s in UNIVERSE}, {s: 1e6 for s in UNIVERSE})
+    provider = DerivativesSentiment(source)
+
+    started = time.monotonic()
+    assert provider.refresh_in_background(UNIVERSE)
+    assert not provider.refresh_in_background(UNIVERSE)  # one refresh at a time
+    assert provider.get(UNIVERSE[0]) == {'sentiment': 'NEUTRAL', 'score': 50}
+    assert time.monotonic() - started < 0.5
+
+    source.release.set()
+    provider.wait(5)
+    assert provider.get(UNIVERSE[0])['funding_rate'] == 0.0001
+    assert not provider.refresh_in_background(UNIVERSE)  # not due again yet
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from indicators import NumpyBackend, TaBackend, cross_check, synthetic_ohlcv
+
+
+@pytest.mark.parametrize('length', [30, 100, 500, 2000])
+def test_numpy_matches_ta(length):
+    cross_check(synthetic_ohlcv(length, seed=length))
+
+
+def test_flat_prices():
+    df = synthetic_ohlcv(100, seed=1)
+    for column in ('open', 'high', 'low', 'close'):
+        df[column] = 100.0
+    cross_check(df)
+
+
+def test_zero_volume_runs():
+    df = synthetic_ohlcv(100, seed=2)
+    df.iloc[20:60, df.columns.get_loc('volume')] = 0.0
+    cross_check(df)
+
+
+def test_all_zero_volume():
+    df = synthetic_ohlcv(100, seed=3)
+    df['volume'] = 0.0
+    cross_check(df)
+
+
+@pytest.mark.parametrize('length', [100, 2000])
+def test_float32_input(length):
+    cross_check(synthetic_ohlcv(length, seed=length).astype('float32'))
+
+
+@pytest.mark.parametrize('length', [1, 5, 13])
+def test_fewer_candles_than_window(length):
+    df = synthetic_ohlcv(length, seed=length)
+    high, low, close, volume = df['high'], df['low'], df['close'], df['volume']
+    numpy_backend, ta_backend = NumpyBackend(), TaBackend()
+    pairs = [
+        (numpy_backend.rsi(close), ta_backend.rsi(close)),
+        (numpy_backend.ema(close, 20), ta_backend.ema(close, 20)),
+        (numpy_backend.obv(close, volume), ta_backend.obv(close, volume)),
+        (numpy_backend.vpt(close, volume), ta_backend.vpt(close, volume)),
+        (numpy_backend.mfi(high, low, close, volume), ta_backend.mfi(high, low, close, volume)),
+        (numpy_backend.rolling_max(high, 20), ta_backend.rolling_max(high, 20)),
+        (numpy_backend.rolling_min(low, 20), ta_backend.rolling_min(low, 20)),
+        *zip(numpy_backend.macd(close), ta_backend.macd(close)),
+        *zip(numpy_backend.bollinger(close), ta_backend.bollinger(close)),
+    ]
+    for actual, expected in pairs:
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                                   rtol=1e-7, atol=1e-9, equal_nan=True)
+
+    # ta's ATR raises on short input; the kernel returns zeros (ta's warm-up value)
+    assert np.all(numpy_backend.atr(high, low, close) == 0.0)
@@ -0,0 +1,70 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from benchmark import FakeExchange, generate_ohlcv, make_bot
+from market_buffer import MarketDataStore, OHLCVRingBuffer
+
+
+class RecordingExchange(FakeExchange):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=None, params=None):
+        self.requests.append((timeframe, since, limit))
+        return super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+def test_append_wraps_and_stays_contiguous():
+    rows = generate_ohlcv(130, '1h')
+    buffer = OHLCVRingBuffer(capacity=50)
+    buffer.append(rows[:40])
+    for row in rows[40:]:
+        buffer.append([row])
+
+    timestamps, values = buffer.view()
+    assert buffer.size == 50
+    np.testing.assert_array_equal(timestamps, [row[0] for row in rows[-50:]])
+    np.testing.assert_array_equal(values, [row[1:] for row in rows[-50:]])
+
+
+def test_reset_keeps_older_history_append_would_drop():
+    rows = generate_ohlcv(100, '1h')
+    buffer = OHLCVRingBuffer(capacity=200)
+    buffer.append(rows[-20:])
+    assert buffer.append(rows) == 0  # all older or equal to the last candle
+
+    assert buffer.reset(rows) == 100
+    assert buffer.size == 100
+    np.testing.assert_array_equal(buffer.view()[0], [row[0] for row in rows])
+
+
+@pytest.fixture
+def buffered_bot():
+    pairs = ['SYM000/USDT']
+    exchange = RecordingExchange(pairs, ['15m', '1h', '4h'], 150)
+    bot = make_bot(exchange, pairs)
+    bot.market_store = MarketDataStore(capacity=200)
+    return bot, exchange
+
+
+def test_larger_limit_after_short_first_fetch(buffered_bot):
+    bot, exchange = buffered_bot
+    symbol = 'SYM000/USDT'
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert len(bot.get_market_data(symbol, '1h', 50)) == 50
+        df = bot.get_market_data(symbol, '1h', 100)
+        again = bot.get_market_data(symbol, '1h', 100)
+
+    assert len(df) == len(again) == 100
+    # Full fetches for the first two calls, then incremental
+    assert [(since is None, limit) for _, since, limit in exchange.requests] == [
+        (True, 50), (True, 100), (False, None)]
+
+    unbuffered = make_bot(exchange, [symbol])
+    expected = unbuffered.get_market_data(symbol, '1h', 100)
+    np.testing.assert_array_equal(again.to_numpy(), expected.to_numpy())
+    assert (again.index == expected.index).all()
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from notifier import AlertDispatcher, WebhookDestination
+
+
+class FakeWebhook:
+    """
+    Local aiohttp server answering with a scripted sequence of statuses
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.delivered = []
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def handle(self, request):
+        payload = await request.json()
+        self.requests.append((time.monotonic(), payload))
+        status, headers = self.responses.pop(0) if self.responses else (200, {})
+        if status < 300:
+            self.delivered.append(payload['text'])
+        return web.Response(status=status, headers=headers)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post('/hook', self.handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}/hook"
+        self._started.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        self._started.wait(5)
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def webhook():
+    servers = []
+
+    def factory(responses=()):
+        server = FakeWebhook(responses).start()
+        servers.append(server)
+        return server
+    yield factory
+    for server in servers:
+        server.stop()
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError('condition not met')
+        time.sleep(0.01)
+
+
+def test_batches_and_retries_until_delivered(webhook):
+    server = webhook([(500, {}), (429, {'Retry-After': '1'}), (200, {})])
+    dispatcher = AlertDispatcher([WebhookDestination(server.url, rate=100, burst=10)],
+                                 render=str, batch_window=0.3, backoff=0.01)
+    try:
+        started = time.monotonic()
+        for i in range(3):
+            assert dispatcher.submit([f"signal {i}"])
+        assert time.monotonic() - started < 0.1  # submit only enqueues
+
+        wait_for(lambda: dispatcher.stats()['sent'] == 1)
+        stats = dispatcher.stats()
+    finally:
+        dispatcher.stop()
+
+    assert server.delivered == ['signal 0\nsignal 1\nsignal 2']  # one coalesced message
+    assert len(server.requests) == 3
+    assert stats['batches'] == 1
+    assert stats['retries'] == 2
+    assert stats['sent'] == 1
+    assert stats['failed'] == 0
+    # Retry-After was honoured between the 429 and the final attempt
+    assert server.requests[2][0] - server.requests[1][0] >= 0.9
+
+
+def test_gives_up_after_max_retries(webhook):
+    server = webhook([(503, {})] * 10)
+    dispatcher = AlertDispatcher([WebhookDestination(server.url, rate=100, burst=10)],
+                                 render=str, batch_window=0.05, backoff=0.01, max_retries=2)
+    try:
+        dispatcher.submit(['signal'])
+        wait_for(lambda: dispatcher.stats()['failed'] == 1)
+        stats = dispatcher.stats()
+    finally:
+        dispatcher.stop()
+
+    assert len(server.requests) == 3
+    assert stats['retries'] == 2
+    assert stats['sent'] == 0
+
+
+def test_full_queue_drops_without_blocking(webhook):
+    server = webhook()
+    dispatcher = AlertDispatcher([WebhookDestination(server.url, rate=100, burst=10)],
+                                 render=str, queue_size=2, batch_window=0.05)
+    try:
+        dispatcher.start()
+        # Stall the dispatcher loop so nothing is consumed while we submit
+        dispatcher._loop.call_soon_threadsafe(time.sleep, 0.5)
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        accepted = [dispatcher.submit([f"signal {i}"]) for i in range(5)]
+        assert time.monotonic() - started < 0.1
+        assert accepted == [True, True, False, False, False]
+
+        wait_for(lambda: dispatcher.stats()['sent'] >= 1 and dispatcher.stats()['queued'] == 0)
+        stats = dispatcher.stats()
+    finally:
+        dispatcher.stop()
+
+    assert stats['submitted'] == 2
+    assert stats['dropped'] == 3
+    assert server.delivered == ['signal 0\nsignal 1']
+
+
+def test_stop_delivers_queued_signals(webhook):
+    server = webhook()
+    dispatcher = AlertDispatcher([WebhookDestination(server.url, rate=100, burst=10)],
+                                 render=str, batch_window=5.0)
+    for i in range(3):
+        assert dispatcher.submit([f"signal {i}"])
+
+    started = time.monotonic()
+    dispatcher.stop()
+    assert time.monotonic() - started < 2.0  # does not sit out the batch window
+    assert '\n'.join(server.delivered).split('\n') == ['signal 0', 'signal 1', 'signal 2']
+    assert dispatcher.stats()['queued'] == 0
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+class BadSymbol(Exception):
+    pass
+
+
+class Flaky:
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        if error is not None:
+            raise error
+        return 'ok'
+
+
+def test_non_retryable_error_raised_without_hedge_or_breaker_failure():
+    caller = ResilientCaller(timeout=2, hedge_after=0.5, failure_threshold=2)
+    fn = Flaky([BadSymbol('delisted')] * 5)
+    for _ in range(3):
+        with pytest.raises(BadSymbol):
+            caller.call('fetch_ohlcv', fn)
+
+    assert fn.calls == 3
+    assert caller.metrics['hedged'] == 0
+    assert caller.metrics['errors'] == 3
+    assert caller.breaker('fetch_ohlcv').state == CircuitBreaker.CLOSED
+
+
+def test_retryable_error_is_hedged():
+    caller = ResilientCaller(timeout=2, hedge_after=0.5)
+    fn = Flaky([ConnectionError('reset')])
+    assert caller.call('fetch_ohlcv', fn) == 'ok'
+    assert fn.calls == 2
+    assert caller.metrics['hedged'] == 1
+
+
+def test_slow_call_is_hedged():
+    caller = ResilientCaller(timeout=2, hedge_after=0.05)
+    fn = Flaky(delay=0.3)
+    started = time.monotonic()
+    assert caller.call('fetch_ohlcv', fn) == 'ok'
+    assert fn.calls == 2
+    assert time.monotonic() - started < 1.0
+
+
+def test_custom_retry_on():
+    caller = ResilientCaller(timeout=2, hedge_after=0.5, retry_on=(BadSymbol,))
+    fn = Flaky([BadSymbol('flaky')])
+    assert caller.call('fetch_ohlcv', fn) == 'ok'
+    assert fn.calls == 2
+
+
+def test_breaker_opens_on_network_failures_and_recovers():
+    caller = ResilientCaller(timeout=1, hedge_after=0.5, failure_threshold=2, reset_timeout=0.2)
+    fn = Flaky([TimeoutError('down')] * 4)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            caller.call('fetch_ohlcv', fn)
+    assert caller.breaker('fetch_ohlcv').state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        caller.call('fetch_ohlcv', fn)
+    assert fn.calls == 4
+
+    time.sleep(0.25)
+    assert caller.call('fetch_ohlcv', fn) == 'ok'
+    assert caller.breaker('fetch_ohlcv').state == CircuitBreaker.CLOSED
+
+
+def test_hung_call_bounded_by_timeout():
+    caller = ResilientCaller(timeout=0.3, hedge_after=0.1)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        caller.call('fetch_ohlcv', Flaky(delay=2.0))
+    assert time.monotonic() - started < 0.6
+    assert caller.metrics['timeouts'] == 1
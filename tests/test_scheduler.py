@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+from bot_loader import create_bot, load_bot_module
+from scheduler import ScanScheduler, next_candle_close
+
+PAIRS = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT', 'DDD/USDT', 'EEE/USDT']
+
+
+class StubBot:
+    """
+    run_scan_cycle blocks until released and reports a scripted carry-over
+    """
+
+    def __init__(self, carry_over=()):
+        self.carry_over = list(carry_over)
+        self.deadlines = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def run_scan_cycle(self, deadline):
+        self.deadlines.append(deadline)
+        self.started.set()
+        self.release.wait(5)
+        return []
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    bot = create_bot()
+    bot.trading_pairs = list(PAIRS)
+    bot.sentiment = None
+    bot.notifier = None
+    clock = FakeClock()
+    monkeypatch.setattr(load_bot_module(), 'time', clock)
+    bot.clock = clock
+    return bot
+
+
+def test_next_candle_close():
+    assert next_candle_close(1000, 300) == 1200
+    assert next_candle_close(1200, 300) == 1500  # strictly after a close
+    assert next_candle_close(1199.9, 300) == 1200
+
+
+def test_deadline_for():
+    scan = ScanScheduler(StubBot(), period_seconds=300, settle_seconds=5)
+    assert scan.margin == 30  # 10% of the period, capped at 30s
+    assert scan.deadline_for(1000) == 1200 + 5 - 30
+
+    scan = ScanScheduler(StubBot(), period_seconds=3600, settle_seconds=5, deadline_margin=60)
+    assert scan.deadline_for(3700) == 7200 + 5 - 60
+
+
+def test_overlapping_run_is_skipped_and_counted():
+    stub = StubBot()
+    stub.release.clear()
+    scan = ScanScheduler(stub, period_seconds=300)
+
+    first = threading.Thread(target=scan.run_cycle)
+    first.start()
+    assert stub.started.wait(5)
+    assert scan.run_cycle() is None  # previous run still holds the lock
+
+    stub.release.set()
+    first.join(5)
+    assert scan.stats['skipped_overlaps'] == 1
+    assert scan.stats['runs'] == 1
+    assert len(stub.deadlines) == 1
+
+    assert scan.run_cycle() == []  # lock released after the run
+    assert scan.stats['runs'] == 2
+
+
+def test_carry_over_counts_as_deadline_miss():
+    scan = ScanScheduler(StubBot(carry_over=['AAA/USDT', 'BBB/USDT']), period_seconds=300)
+    scan.run_cycle()
+    assert scan.stats['deadline_misses'] == 1
+    assert scan.stats['carried_over'] == 2
+
+
+def test_scan_stops_at_deadline_and_carries_over(bot):
+    scanned = []
+
+    def generate_signal(pair):
+        scanned.append(pair)
+        bot.clock.now += 10  # each pair takes 10s
+        return None
+
+    bot.generate_signal = generate_signal
+    bot.request_delay = 0.5
+    deadline = bot.clock.now + 25
+
+    assert bot.scan_all_pairs(deadline) == []
+    assert scanned == PAIRS[:3]  # 0s, 10.5s and 21s are before the deadline
+    assert bot.carry_over == PAIRS[3:]
+    assert bot.last_scan['scanned'] == 3
+    assert bot.last_scan['carried_over'] == 2
+
+    # The leftovers go first next cycle, and a full scan clears the carry-over
+    scanned.clear()
+    bot.scan_all_pairs()
+    assert scanned[:2] == PAIRS[3:]
+    assert bot.carry_over == []
+
+
+def test_request_delay_is_capped_by_deadline(bot):
+    bot.generate_signal = lambda pair: None
+    bot.request_delay = 100
+    started = bot.clock.now
+
+    bot.scan_all_pairs(started + 5)
+    assert bot.clock.now == started + 5  # slept only until the deadline
+    assert bot.carry_over == PAIRS[1:]
+
+
+def test_prioritize_pairs_order(bot):
+    bot.symbol_stats = {
+        'AAA/USDT': {'quote_volume': 1e6, 'volatility': 0.01},  # 1e4
+        'BBB/USDT': {'quote_volume': 1e6, 'volatility': 0.05},  # 5e4
+        'CCC/USDT': {'quote_volume': 1e5, 'volatility': 0.01},  # 1e3
+        'EEE/USDT': {'quote_volume': 1e9, 'volatility': 0.10},  # most active, still behind DDD and CCC
+    }
+    bot.active_signals = {'DDD/USDT': object()}
+    bot.carry_over = ['CCC/USDT']
+
+    # Active, then carried over, then by volume x volatility
+    assert bot.prioritize_pairs() == ['DDD/USDT', 'CCC/USDT', 'EEE/USDT', 'BBB/USDT', 'AAA/USDT']
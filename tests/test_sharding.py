@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from bot_loader import create_bot
+from derivatives_sentiment import DerivativesSentiment, StaticDerivativesSource
+from sharding import ShardStore, ShardWorker
+
+
+class StubBot:
+    def __init__(self, pairs):
+        self.trading_pairs = list(pairs)
+        self.active_signals = {}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ShardStore(str(tmp_path / 'shards.db'))
+    yield store
+    store.close()
+
+
+def join(store, worker_id, symbols, ttl=60):
+    store.heartbeat(worker_id)
+    for symbol in symbols:
+        assert store.acquire(symbol, worker_id, ttl)
+
+
+def test_merge_includes_workers_that_published_earlier_cycles(store, make_record):
+    join(store, 'w1', ['AAA/USDT'])
+    join(store, 'w2', ['BBB/USDT'])
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.6)])
+    # w2 finished its run after the cycle boundary
+    store.publish_results(101, 'w2', [make_record('BBB/USDT', 0.8)])
+
+    merged = store.merged_results()
+    assert [r.symbol for r in merged] == ['BBB/USDT', 'AAA/USDT']
+
+
+def test_merge_uses_each_workers_latest_publication(store, make_record):
+    join(store, 'w1', ['AAA/USDT'])
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.6)])
+    store.publish_results(101, 'w1', [])  # nothing this time: the old signal must not resurface
+
+    assert store.merged_results() == []
+    assert [r.symbol for r in store.merged_results(cycle=100)] == ['AAA/USDT']
+
+
+def test_merge_drops_results_of_workers_that_left(store, make_record):
+    join(store, 'w1', ['AAA/USDT'])
+    join(store, 'w2', ['BBB/USDT'])
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.9)])
+    store.leave('w1')
+    store.publish_results(101, 'w2', [])
+    store.publish_results(102, 'w2', [])
+
+    assert store.merged_results() == []
+    assert [r.symbol for r in store.merged_results(cycle=100)] == ['AAA/USDT']
+
+
+def test_merge_drops_results_of_dead_workers(store, make_record):
+    join(store, 'w1', ['AAA/USDT'], ttl=60)
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.9)])
+
+    assert len(store.merged_results()) == 1
+    assert store.merged_results(now=time.time() + 120) == []  # lease lapsed without renewal
+
+
+def test_merge_follows_moved_symbol_to_its_new_owner(store, make_record):
+    join(store, 'w1', ['AAA/USDT'])
+    join(store, 'w2', [])
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.9)])
+
+    # AAA moved to w2, which has not published since: the old result is not w1's to report
+    store.release('AAA/USDT', 'w1')
+    assert store.acquire('AAA/USDT', 'w2', 60)
+    assert store.merged_results() == []
+
+    store.publish_results(101, 'w2', [make_record('AAA/USDT', 0.5)])
+    merged = store.merged_results()
+    assert [(r.symbol, r.signal_strength) for r in merged] == [('AAA/USDT', 0.5)]
+
+
+def test_prune_uses_each_tables_latest_cycle(store, make_record):
+    join(store, 'w1', ['AAA/USDT'])
+    store.publish_results(100, 'w1', [make_record('AAA/USDT', 0.9)])
+    for cycle in range(101, 112):
+        store.publish_results(cycle, 'w1', [])  # publications advance, results do not
+    store.prune_results(keep_cycles=10)
+
+    published = [row[0] for row in store.conn.execute('SELECT cycle FROM publications ORDER BY cycle')]
+    assert published == list(range(102, 112))
+    assert store.merged_results(cycle=100)  # still within 10 cycles of the latest result
+
+
+def test_rebalance_drops_signals_whose_lease_is_held_elsewhere(store, make_record):
+    universe = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT']
+    bot = StubBot(universe)
+    worker = ShardWorker(bot, store, 'w1', universe=universe, lease_ttl=60, heartbeat_ttl=60)
+    assert worker.rebalance() == universe
+    bot.active_signals['AAA/USDT'] = make_record('AAA/USDT')
+
+    # Our lease lapsed and a peer took the symbol
+    store.conn.execute("UPDATE leases SET owner = 'w2' WHERE symbol = 'AAA/USDT'")
+
+    assert 'AAA/USDT' not in worker.rebalance()
+    assert 'AAA/USDT' not in bot.active_signals
+    assert 'AAA/USDT' not in bot.trading_pairs
+
+
+def test_shard_sentiment_is_scored_against_the_full_universe(store):
+    universe = [f"SYM{i:03d}/USDT" for i in range(8)]
+    funding = {s: 0.0001 * i for i, s in enumerate(universe)}
+    source = StaticDerivativesSource(funding, {s: 1e6 for s in universe})
+    bot = create_bot()
+    bot.notifier = None
+    bot.sentiment = DerivativesSentiment(source)
+
+    store.heartbeat('w2')
+    worker = ShardWorker(bot, store, 'w1', universe=universe, lease_ttl=60, heartbeat_ttl=60)
+    owned = worker.rebalance()
+    assert 0 < len(owned) < len(universe)
+
+    bot.refresh_sentiment()
+    bot.sentiment.wait(5)
+    full = DerivativesSentiment(source)
+    full.refresh(universe)
+    for symbol in owned:
+        assert bot.sentiment.get(symbol)['funding_z'] == full.get(symbol)['funding_z']
@@ -0,0 +1,50 @@
+from signal_records import SignalRecord, SignalStatus, StatusRecord
+
+# Row written by the original record schema (before the derivatives fields)
+LEGACY_ROW = (
+    '["BTC/USDT","LONG",0.7,1700000000.0,100.0,["structure_bullish_1h"],"BULLISH",1.0,0.8,'
+    '"BULLISH",1.0,0.8,"FEAR",70.0,30,true,false,55.0,100.0,95.0,105.0,110.0,115.0,2.0,0,0,'
+    '["IN_PROFIT",101.0,1.0,1.0,"msg"]]'
+)
+
+
+def test_legacy_row_loads_with_default_derivatives_fields():
+    record = SignalRecord.from_json(LEGACY_ROW)
+    assert record.symbol == 'BTC/USDT'
+    assert record.fear_greed_index == 30
+    assert record.divergence_count == 0
+    assert record.current_status.status == SignalStatus.IN_PROFIT
+    assert (record.funding_rate, record.funding_z, record.oi_change, record.oi_z) == (None, None, None, None)
+
+
+def test_row_round_trip(make_record):
+    record = make_record()
+    record.funding_rate, record.funding_z, record.oi_change, record.oi_z = 0.0001, 1.5, 0.02, -0.3
+    record.current_status = StatusRecord(SignalStatus.TP1_HIT, 106.0, 6.0, 6.0, 'TP1')
+    assert SignalRecord.from_json(record.to_json()) == record
+
+
+def test_dict_round_trip_and_legacy_export(make_record):
+    record = make_record()
+    record.funding_z = 0.5
+    data = record.to_dict()
+    assert SignalRecord.from_dict(data) == record
+
+    for name in ('funding_rate', 'funding_z', 'oi_change', 'oi_z'):
+        del data[name]
+    assert SignalRecord.from_dict(data).funding_z is None
+
+
+def test_shard_store_loads_legacy_rows(tmp_path):
+    from sharding import ShardStore
+
+    store = ShardStore(str(tmp_path / 'shards.db'))
+    store.conn.execute('INSERT INTO active_signals (symbol, payload, updated) VALUES (?, ?, 0)',
+                       ('BTC/USDT', LEGACY_ROW))
+    store.conn.execute('INSERT INTO results VALUES (1, ?, ?, 0.7, ?, 0)', ('BTC/USDT', 'w1', LEGACY_ROW))
+    store.conn.execute("INSERT INTO publications VALUES ('w1', 1, 0)")
+    store.acquire('BTC/USDT', 'w1', ttl=60)
+
+    assert store.load_active_signal('BTC/USDT').symbol == 'BTC/USDT'
+    assert [r.symbol for r in store.merged_results()] == ['BTC/USDT']
+    store.close()
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from market_cache import MarketCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'ccxt', 'ta')
+MARKETS = {'BTC/USDT': {'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT'}}
+
+
+class FakeExchange:
+    """
+    Just the ccxt surface MarketCache.apply uses
+    """
+
+    id = 'fake'
+
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.network_loads = 0
+
+    def load_markets(self):
+        self.network_loads += 1
+        self.markets = dict(MARKETS)
+        self.currencies = {'BTC': {'id': 'BTC'}, 'USDT': {'id': 'USDT'}}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MarketCache(str(tmp_path), ttl=60)
+
+
+def age_cache(cache, exchange_id, seconds):
+    with open(cache.path(exchange_id)) as f:
+        payload = json.load(f)
+    payload['saved_at'] -= seconds
+    with open(cache.path(exchange_id), 'w') as f:
+        json.dump(payload, f)
+
+
+def test_apply_uses_network_then_cache(cache):
+    exchange = FakeExchange()
+    assert cache.apply(exchange) == 'network'
+    assert os.path.exists(cache.path('fake'))
+
+    warm = FakeExchange()
+    assert cache.apply(warm) == 'cache'
+    assert warm.network_loads == 0
+    assert warm.markets == MARKETS
+    assert warm.currencies == exchange.currencies
+
+
+def test_expired_cache_is_ignored(cache):
+    cache.apply(FakeExchange())
+    assert cache.load('fake') is not None
+
+    age_cache(cache, 'fake', 61)
+    assert cache.load('fake') is None
+
+    exchange = FakeExchange()
+    assert cache.apply(exchange) == 'network'
+    assert exchange.network_loads == 1
+    assert cache.load('fake') is not None  # refreshed
+
+
+def test_apply_without_refresh_skips_network(cache):
+    exchange = FakeExchange()
+    assert cache.apply(exchange, refresh=False) == 'skipped'
+    assert exchange.network_loads == 0 and exchange.markets is None
+
+
+def test_corrupt_cache_reads_as_missing(cache, tmp_path):
+    (tmp_path / 'markets_fake.json').write_text('{not json')
+    assert cache.load('fake') is None
+
+
+def heavy_modules_after(code):
+    script = f"import sys\n{code}\nprint('loaded:', *(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True,
+                            text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    line = next(l for l in result.stdout.splitlines() if l.startswith('loaded:'))
+    return line.split()[1:]
+
+
+def test_importing_main_does_not_load_heavy_modules():
+    assert heavy_modules_after('import main') == []
+
+
+def test_creating_bot_does_not_load_heavy_modules():
+    assert heavy_modules_after('from bot_loader import create_bot\ncreate_bot()') == []